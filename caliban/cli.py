@@ -153,6 +153,15 @@ def no_cache_arg(parser):
   )
 
 
+def cache_from_arg(parser):
+  parser.add_argument(
+    "--cache_from",
+    action="append",
+    help="Image to use as a Docker build cache source. Repeat the flag to "
+    "supply multiple images.",
+  )
+
+
 def docker_run_arg(parser):
   """Adds a command that accepts arguments to pass directly to `docker run`."""
   parser.add_argument(
@@ -252,6 +261,7 @@ def base_parser(base):
   cloud_key_arg(base)
   setup_extras(base)
   no_cache_arg(base)
+  cache_from_arg(base)
 
 
 def building_parser(base):
@@ -341,6 +351,12 @@ def local_run_parser(base):
   image_id_arg(parser)
   docker_run_arg(parser)
   xgroup_submit_arg(parser)
+  parser.add_argument(
+    "--parallelism",
+    type=ua.argparse_schema(us.PositiveInt),
+    default=1,
+    help="Number of experiments to run at once. Defaults to 1.",
+  )
 
 
 def gpu_spec_arg(parser, validate_count: bool = False):
@@ -609,6 +625,7 @@ def generate_docker_args(
     "adc_path": adc_path,
     "setup_extras": setup_extras,
     "no_cache": args.get("no_cache", False),
+    "cache_from": args.get("cache_from"),
     "build_path": os.getcwd(),
   }
 
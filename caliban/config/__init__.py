@@ -240,6 +240,15 @@ def apt_packages(conf: CalibanConfig, mode: JobMode) -> List[str]:
   return packages
 
 
+def build_time_credentials(conf: CalibanConfig) -> bool:
+  """Returns True if the user has asked for Cloud credentials to be available
+  while their dependencies install (for private git dependencies, say), False
+  otherwise.
+
+  """
+  return conf.get("build_time_credentials", False)
+
+
 def base_image(conf: CalibanConfig, mode: JobMode) -> Optional[str]:
   """Returns a custom base image, if the user has supplied one in the
   calibanconfig.
@@ -56,7 +56,7 @@ def _is_compound_key(s: Any) -> bool:
   if (not isinstance(s, str)) or len(s) <= 2:
     return False
   else:
-    return s[0] == "[" and s[-1] == "]"
+    return s.startswith("[") and s.endswith("]")
 
 
 def _tupleize_compound_key(k: str) -> List[str]:
@@ -198,7 +198,7 @@ def validate_compound_keys(m: ExpConf) -> ExpConf:
     if k is a compound key, the number of arguments in each sublist must match the
     number of arguments in k"""
 
-    if k[0] == "[":
+    if k.startswith("["):
       n_args = len(k.strip("][").split(","))
       if not (isinstance(v, list)):
         raise argparse.ArgumentTypeError(
@@ -20,35 +20,69 @@ and notebooks in a Docker environment.
 
 from __future__ import absolute_import, division, print_function
 
+import functools
 import json
 import os
+import re
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
-from pathlib import Path
-from typing import Any, Dict, List, NamedTuple, NewType, Optional, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from absl import logging
-from blessings import Terminal
 
 import caliban.config as c
 import caliban.util as u
 import caliban.util.fs as ufs
 import caliban.util.metrics as um
 
-t = Terminal()
-
 DEV_CONTAINER_ROOT = "gcr.io/blueshift-playground/blueshift"
 DEFAULT_GPU_TAG = "gpu-ubuntu1804-py37-cuda101"
 DEFAULT_CPU_TAG = "cpu-ubuntu1804-py37"
-TF_VERSIONS = {"2.2.0", "1.12.3", "1.14.0", "1.15.0"}
+TF_VERSIONS = frozenset({"2.2.0", "1.12.3", "1.14.0", "1.15.0"})
 DEFAULT_WORKDIR = "/usr/app"
 CREDS_DIR = "/.creds"
 RESOURCE_DIR = "/.resources"
 CONDA_BIN = "/opt/conda/bin/conda"
 
-ImageId = NewType("ImageId", str)
-ArgSeq = NewType("ArgSeq", List[str])
+# pip's wheel cache would otherwise get baked into every layer that installs
+# packages, and the version check is a network round trip per RUN.
+PIP_INSTALL = "pip install --no-cache-dir --disable-pip-version-check"
+
+# For RUNs that keep pip's cache in a BuildKit cache mount, outside the image.
+PIP_CACHED_INSTALL = "pip install --disable-pip-version-check"
+
+# Target of the pip cache mount. This lives outside the user's home directory,
+# since BuildKit creates any missing parent directories of a mount as root.
+PIP_CACHE_DIR = "/tmp/caliban-pip-cache"
+
+# BuildKit cache mounts for aptitude's package lists and downloaded packages.
+# apt locks these directories, so concurrent builds take turns with them.
+APT_CACHE_MOUNTS = (
+  "--mount=type=cache,target=/var/cache/apt,sharing=locked "
+  "--mount=type=cache,target=/var/lib/apt,sharing=locked"
+)
+
+# Dockerfile entry that installs cloud_sql_proxy; runs as root.
+CLOUD_SQL_PROXY_INSTALL = """RUN wget \
+  -q https://dl.google.com/cloudsql/cloud_sql_proxy.linux.amd64 \
+  -O /usr/bin/cloud_sql_proxy \
+  && chmod 755 /usr/bin/cloud_sql_proxy"""
+
+# Every container's ENTRYPOINT runs the user's executable through caliban's
+# launcher script, staged into RESOURCE_DIR by build_image.
+LAUNCHER_COMMAND = [
+  "python",
+  os.path.join(RESOURCE_DIR, um.LAUNCHER_SCRIPT),
+  "--caliban_command",
+]
+
+# Files inside the container are owned by the user and group running caliban,
+# neither of which can change while the process is running.
+_UID = os.getuid()
+_GID = os.getgid()
 
 
 class DockerError(Exception):
@@ -100,14 +134,17 @@ def apt_install(*packages: str) -> str:
   return f"{no_prompt} apt-get install --yes --no-install-recommends {package_str}"
 
 
-def apt_command(commands: List[str]) -> List[str]:
+def apt_command(commands: List[str], cleanup: bool = True) -> List[str]:
   """Pre-and-ap-pends the supplied commands with the appropriate in-container and
   cleanup command for aptitude.
 
+  Pass cleanup=False if aptitude's caches live in cache mounts, and so never
+  end up in the image.
+
   """
   update = ["apt-get update"]
-  cleanup = ["apt-get clean", "rm -rf /var/lib/apt/lists/*"]
-  return update + commands + cleanup
+  clean = ["apt-get clean", "rm -rf /var/lib/apt/lists/*"] if cleanup else []
+  return update + commands + clean
 
 
 def copy_command(
@@ -144,39 +181,47 @@ SHELL_DICT = {
 }
 
 
+@functools.lru_cache(maxsize=1)
 def default_shell() -> Shell:
   """Returns the shell to load into the container. Defaults to Shell.bash, but if
   the user's SHELL variable refers to a supported sub-shell, returns that
   instead.
 
   """
-  ret = Shell.bash
-
-  if "zsh" in os.environ.get("SHELL"):
-    ret = Shell.zsh
-
-  return ret
+  shell = os.environ.get("SHELL", "")
+  return Shell.zsh if "zsh" in shell else Shell.bash
 
 
+@functools.lru_cache(maxsize=None)
 def adc_location(home_dir: Optional[str] = None) -> str:
   """Returns the location for application default credentials, INSIDE the
   container (so, hardcoded unix separators), given the supplied home directory.
 
   """
   if home_dir is None:
-    home_dir = Path.home()
+    home_dir = u.home_dir()
+
+  return f"{home_dir}/.config/gcloud/application_default_credentials.json"
+
+
+def container_user() -> str:
+  """Returns the "uid:gid" pair that owns the files inside the generated
+  container; this matches the user and group running caliban.
 
-  return "{}/.config/gcloud/application_default_credentials.json".format(home_dir)
+  """
+  return f"{_UID}:{_GID}"
 
 
+@functools.lru_cache(maxsize=None)
 def container_home():
   """Returns the location of the home directory inside the generated
   container.
 
   """
-  return "/home/{}".format(u.current_user())
+  return f"/home/{u.current_user()}"
 
 
+@functools.lru_cache(maxsize=None)
 def tf_base_image(job_mode: c.JobMode, tensorflow_version: str) -> str:
   """Returns the base image to use, depending on whether or not we're using a
   GPU. This is JUST for building our base images for Blueshift; not for
@@ -186,19 +231,21 @@ def tf_base_image(job_mode: c.JobMode, tensorflow_version: str) -> str:
 
   """
   if tensorflow_version not in TF_VERSIONS:
+    versions = ", ".join(sorted(TF_VERSIONS))
     raise Exception(
-      """{} is not a valid tensorflow version.
-    Try one of: {}""".format(tensorflow_version, TF_VERSIONS)
+      f"""{tensorflow_version} is not a valid tensorflow version.
+    Try one of: {versions}"""
     )
 
   gpu = "-gpu" if c.gpu(job_mode) else ""
-  return "tensorflow/tensorflow:{}{}-py3".format(tensorflow_version, gpu)
+  return f"tensorflow/tensorflow:{tensorflow_version}{gpu}-py3"
 
 
 def base_image_suffix(job_mode: c.JobMode) -> str:
   return DEFAULT_GPU_TAG if c.gpu(job_mode) else DEFAULT_CPU_TAG
 
 
+@functools.lru_cache(maxsize=None)
 def base_image_id(job_mode: c.JobMode) -> str:
   """Returns the default base image for all caliban Dockerfiles."""
   base_suffix = base_image_suffix(job_mode)
@@ -214,7 +261,7 @@ def extras_string(extras: List[str]) -> str:
   """
   ret = "."
   if len(extras) > 0:
-    ret += "[{}]".format(",".join(extras))
+    ret += f"[{','.join(extras)}]"
   return ret
 
 
@@ -238,6 +285,24 @@ def base_extras(
   return ret
 
 
+def _pip_install_entry(
+  user_id: int, user_group: int, args: str, cache_dir: Optional[str] = None
+) -> str:
+  """Returns a Dockerfile RUN entry that pip installs the supplied args.
+
+  If cache_dir is supplied, pip's cache lives in a BuildKit cache mount at that
+  path. The mount persists across builds without becoming part of the image,
+  so changing a dependency only downloads the wheels that aren't cached yet.
+
+  """
+  if cache_dir is None:
+    return f'RUN /bin/bash -c "{PIP_INSTALL} {args}"'
+
+  mount = f"--mount=type=cache,target={cache_dir},uid={user_id},gid={user_group}"
+  pip = f"{PIP_CACHED_INSTALL} --cache-dir={cache_dir}"
+  return f'RUN {mount} /bin/bash -c "{pip} {args}"'
+
+
 def _dependency_entries(
   workdir: str,
   user_id: int,
@@ -245,6 +310,7 @@ def _dependency_entries(
   requirements_path: Optional[str] = None,
   conda_env_path: Optional[str] = None,
   setup_extras: Optional[List[str]] = None,
+  pip_cache_dir: Optional[str] = None,
 ) -> str:
   """Returns the Dockerfile entries required to install dependencies from either:
 
@@ -255,34 +321,47 @@ def _dependency_entries(
   An empty list for setup_extras means, run `pip install -c .` with no extras.
   None for this argument means do nothing. If a list of strings is supplied,
   they'll be treated as extras dependency sets.
+
+  Each file is copied in and installed as its own pair of layers. setup.py
+  comes last, since it's edited far more often (version bumps, etc) than the
+  other files; editing it won't invalidate the layers above it.
   """
-  ret = ""
+  entries = []
 
   def copy(from_path, to_path):
     return copy_command(user_id, user_group, from_path, to_path)
 
-  if setup_extras is not None:
-    ret += f"""
-{copy("setup.py", workdir)}
-RUN /bin/bash -c "pip install --no-cache-dir {extras_string(setup_extras)}"
-"""
+  def pip_install(args):
+    return _pip_install_entry(user_id, user_group, args, cache_dir=pip_cache_dir)
 
   if conda_env_path is not None:
-    ret += f"""
+    entries.append(
+      f"""
 {copy(conda_env_path, workdir)}
 RUN /bin/bash -c "{CONDA_BIN} env update \
     --quiet --name caliban \
     --file {conda_env_path} && \
     {CONDA_BIN} clean -y -q --all"
 """
+    )
 
   if requirements_path is not None:
-    ret += f"""
+    entries.append(
+      f"""
 {copy(requirements_path, workdir)}
-RUN /bin/bash -c "pip install --no-cache-dir -r {requirements_path}"
+{pip_install(f"-r {requirements_path}")}
 """
+    )
 
-  return ret
+  if setup_extras is not None:
+    entries.append(
+      f"""
+{copy("setup.py", workdir)}
+{pip_install(extras_string(setup_extras))}
+"""
+    )
+
+  return "".join(entries)
 
 
 def _cloud_sql_proxy_entry(
@@ -311,10 +390,7 @@ def _cloud_sql_proxy_entry(
   return f"""
 USER root
 
-RUN wget \
-  -q https://dl.google.com/cloudsql/cloud_sql_proxy.linux.amd64 \
-  -O /usr/bin/cloud_sql_proxy \
-  && chmod 755 /usr/bin/cloud_sql_proxy
+{CLOUD_SQL_PROXY_INSTALL}
 
 USER {user_id}:{user_group}
 """
@@ -330,14 +406,7 @@ def _generate_entrypoint(executable: str) -> str:
   string with Dockerfile directives to set ENTRYPOINT
 
   """
-  launcher_cmd = json.dumps(
-    [
-      "python",
-      os.path.join(RESOURCE_DIR, um.LAUNCHER_SCRIPT),
-      "--caliban_command",
-      executable,
-    ]
-  )
+  launcher_cmd = json.dumps(LAUNCHER_COMMAND + [executable])
 
   return f"""
 ENTRYPOINT {launcher_cmd}
@@ -382,13 +451,9 @@ def _package_entries(
   executable_s = json.dumps(package.executable + [arg])
   entrypoint_code = _generate_entrypoint(executable_s)
 
-  return f"""
-  {sql_proxy_code}
-
-  {copy_code}
-
-  {entrypoint_code}
-"""
+  # The entrypoint only depends on the package's executable, so it goes ahead
+  # of the code COPY; that way the final layer holds nothing but the source.
+  return f"{sql_proxy_code}{entrypoint_code}\n{copy_code}"
 
 
 def _service_account_entry(
@@ -461,20 +526,22 @@ def _credentials_entries(
   if docker_credentials_dir is None:
     docker_credentials_dir = CREDS_DIR
 
-  ret = ""
+  entries = []
   if credentials_path is not None:
-    ret += _service_account_entry(
-      user_id,
-      user_group,
-      credentials_path,
-      docker_credentials_dir,
-      write_adc_placeholder=adc_path is None,
+    entries.append(
+      _service_account_entry(
+        user_id,
+        user_group,
+        credentials_path,
+        docker_credentials_dir,
+        write_adc_placeholder=adc_path is None,
+      )
     )
 
   if adc_path is not None:
-    ret += _adc_entry(user_id, user_group, adc_path)
+    entries.append(_adc_entry(user_id, user_group, adc_path))
 
-  return ret
+  return "".join(entries)
 
 
 def _notebook_entries(lab: bool = False, version: Optional[str] = None) -> str:
@@ -486,13 +553,34 @@ def _notebook_entries(lab: bool = False, version: Optional[str] = None) -> str:
   version_suffix = ""
 
   if version is not None:
-    version_suffix = "=={}".format(version)
+    version_suffix = f"=={version}"
 
   library = "jupyterlab" if lab else "jupyter"
 
-  return """
-RUN pip install {}{}
-""".format(library, version_suffix)
+  return f"""
+RUN {PIP_INSTALL} {library}{version_suffix}
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _apt_install_command(packages: Tuple[str, ...], cached: bool = False) -> str:
+  """Returns a single shell command that updates aptitude, installs the supplied
+  packages and cleans up after itself. Callers should sort the packages, so
+  that the same set always produces the same command (and Docker layer).
+
+  If cached is True, the command assumes aptitude's directories are BuildKit
+  cache mounts (see APT_CACHE_MOUNTS) and skips the cleanup. It removes the
+  base image's docker-clean hook instead, since that hook deletes every
+  downloaded package and would leave the cache empty.
+
+  """
+  install = [apt_install(*packages)]
+
+  if not cached:
+    return " && ".join(apt_command(install))
+
+  keep_downloads = "rm -f /etc/apt/apt.conf.d/docker-clean"
+  return " && ".join([keep_downloads] + apt_command(install, cleanup=False))
 
 
 def _custom_packages(
@@ -500,10 +588,14 @@ def _custom_packages(
   user_group: int,
   packages: Optional[List[str]] = None,
   shell: Optional[Shell] = None,
+  cache_apt: bool = False,
 ) -> str:
   """Returns the Dockerfile entries necessary to install custom dependencies for
   the supplied shell and sequence of aptitude packages.
 
+  If cache_apt is True, aptitude's package lists and downloads live in BuildKit
+  cache mounts, so rebuilds only download packages that aren't cached yet.
+
   """
   if packages is None:
     packages = []
@@ -513,23 +605,20 @@ def _custom_packages(
 
   ret = ""
 
-  to_install = sorted(packages + SHELL_DICT[shell].packages)
+  # Deduped and sorted, so that the same set of packages always produces the
+  # same RUN instruction, however the config lists them.
+  to_install = tuple(sorted(set(packages + SHELL_DICT[shell].packages)))
 
   if len(to_install) != 0:
-    commands = apt_command([apt_install(*to_install)])
-    ret = """
+    commands = _apt_install_command(to_install, cached=cache_apt)
+    mounts = f"{APT_CACHE_MOUNTS} " if cache_apt else ""
+    ret = f"""
 USER root
 
-RUN {commands}
+RUN {mounts}{commands}
 
 USER {user_id}:{user_group}
-""".format_map(
-      {
-        "commands": " && ".join(commands),
-        "user_id": user_id,
-        "user_group": user_group,
-      }
-    )
+"""
 
   return ret
 
@@ -554,6 +643,11 @@ def _extra_dir_entries(
   """Returns the Dockerfile entries necessary to copy all directories in the
   extra_dirs list into a docker container during build.
 
+  Each directory gets its own COPY layer; a single COPY with many directory
+  sources would copy each directory's contents, not the directory itself.
+  Directories that appear more than once (./data and data/, say) are only
+  copied the first time they appear.
+
   """
   if extra_dirs is None:
     return ""
@@ -561,7 +655,9 @@ def _extra_dir_entries(
   def copy(d):
     return _copy_dir_entry(workdir, user_id, user_group, d)
 
-  return "\n\n".join(map(copy, extra_dirs)) + "\n"
+  unique_dirs = dict.fromkeys(os.path.normpath(d) for d in extra_dirs)
+
+  return "\n" + "\n".join(map(copy, unique_dirs))
 
 
 def _resource_entries(
@@ -592,7 +688,7 @@ def _resource_entries(
   def copy(path):
     return copy_command(uid, gid, path, resource_dir)
 
-  return "\n\n".join(map(copy, resource_files)) + "\n"
+  return "\n" + "\n".join(map(copy, resource_files))
 
 
 def _dockerfile_template(
@@ -610,6 +706,7 @@ def _dockerfile_template(
   extra_dirs: Optional[List[str]] = None,
   resource_files: Optional[List[str]] = None,
   caliban_config: Optional[Dict[str, Any]] = None,
+  buildkit: bool = False,
 ) -> str:
   """Returns a Dockerfile that builds on a local CPU or GPU base image (depending
   on the value of job_mode) to create a container that:
@@ -624,12 +721,17 @@ def _dockerfile_template(
   - copies all source needed by the main module specified by package, and
     potentially injects an entrypoint that, on run, will run that main module
 
+  If buildkit is true, the Dockerfile may use BuildKit-only features, like
+  cache mounts for pip's and aptitude's download caches.
+
   Most functions that call _dockerfile_template pass along any kwargs that they
   receive. It should be enough to add kwargs here, then rely on that mechanism
   to pass them along, vs adding kwargs all the way down the call chain.
   """
-  uid = os.getuid()
-  gid = os.getgid()
+  caliban_config = caliban_config or {}
+
+  uid = _UID
+  gid = _GID
   username = u.current_user()
 
   if isinstance(package, list):
@@ -641,19 +743,19 @@ def _dockerfile_template(
   base_image = c.base_image(caliban_config, job_mode) or base_image_id(job_mode)
   c_home = container_home()
 
-  dockerfile = f"""
+  header = f"""
 FROM {base_image}
 
-# Create the same group we're using on the host machine.
-RUN [ $(getent group {gid}) ] || groupadd --gid {gid} caliban
-
-# Create the user by name. --no-log-init guards against a crash with large user
-# IDs.
-RUN useradd --no-log-init --no-create-home -u {uid} -g {gid} --shell /bin/bash {username}
-
-# The directory is created by root. This sets permissions so that any user can
-# access the folder.
-RUN mkdir -m 777 {workdir} {CREDS_DIR} {RESOURCE_DIR} {c_home}
+# Create the same group we're using on the host machine, then the user by
+# name. --no-log-init guards against a crash with large user IDs.
+#
+# The directories are created by root. This sets permissions so that any user
+# can access the folders.
+#
+# These all share a single RUN so that they produce a single layer.
+RUN ( [ $(getent group {gid}) ] || groupadd --gid {gid} caliban ) && \
+  useradd --no-log-init --no-create-home -u {uid} -g {gid} --shell /bin/bash {username} && \
+  mkdir -m 777 {workdir} {CREDS_DIR} {RESOURCE_DIR} {c_home}
 
 ENV HOME={c_home}
 
@@ -661,36 +763,189 @@ WORKDIR {workdir}
 
 USER {uid}:{gid}
 """
-  dockerfile += _credentials_entries(
-    uid, gid, adc_path=adc_path, credentials_path=credentials_path
+  entries = [header]
+
+  # Entries are ordered from most to least stable, so that editing code,
+  # credentials or extra directories doesn't invalidate Docker's cache for the
+  # (slow) dependency installation layers.
+  entries.append(
+    _custom_packages(
+      uid,
+      gid,
+      packages=c.apt_packages(caliban_config, job_mode),
+      shell=shell,
+      cache_apt=buildkit,
+    )
   )
 
-  dockerfile += _custom_packages(
-    uid, gid, packages=c.apt_packages(caliban_config, job_mode), shell=shell
+  credentials = _credentials_entries(
+    uid, gid, adc_path=adc_path, credentials_path=credentials_path
   )
 
-  dockerfile += _dependency_entries(
-    workdir,
-    uid,
-    gid,
-    requirements_path=requirements_path,
-    conda_env_path=conda_env_path,
-    setup_extras=setup_extras,
+  # Credentials only need to precede the dependency installs if some dependency
+  # (a private git repo, for example) requires them.
+  build_time_credentials = c.build_time_credentials(caliban_config)
+
+  if build_time_credentials:
+    entries.append(credentials)
+
+  entries.append(
+    _dependency_entries(
+      workdir,
+      uid,
+      gid,
+      requirements_path=requirements_path,
+      conda_env_path=conda_env_path,
+      setup_extras=setup_extras,
+      pip_cache_dir=PIP_CACHE_DIR if buildkit else None,
+    )
   )
 
   if inject_notebook.value != "none":
     install_lab = inject_notebook == NotebookInstall.lab
-    dockerfile += _notebook_entries(lab=install_lab, version=jupyter_version)
+    entries.append(_notebook_entries(lab=install_lab, version=jupyter_version))
+
+  # Resources are caliban's own scripts, followed by the launcher config; they
+  # only change when caliban or its config does, which is far less often than
+  # credentials are refreshed.
+  entries.append(_resource_entries(uid, gid, resource_files))
 
-  dockerfile += _extra_dir_entries(workdir, uid, gid, extra_dirs)
+  if not build_time_credentials:
+    entries.append(credentials)
 
-  dockerfile += _resource_entries(uid, gid, resource_files)
+  entries.append(_extra_dir_entries(workdir, uid, gid, extra_dirs))
 
   if package is not None:
     # The actual entrypoint and final copied code.
-    dockerfile += _package_entries(workdir, uid, gid, package, caliban_config)
+    entries.append(_package_entries(workdir, uid, gid, package, caliban_config))
+
+  # Each helper pads its entries with blank lines of its own; collapse the runs
+  # of them, so that the Dockerfile reads the same however the helpers happen
+  # to be combined.
+  return re.sub(r"\n{3,}", "\n\n", "".join(entries))
+
+
+@functools.lru_cache(maxsize=None)
+def _buildx_available() -> bool:
+  """Returns True if the local Docker install has a working buildx plugin, False
+  otherwise. Docker 23+ refuses to build with DOCKER_BUILDKIT=1 without it.
+
+  """
+  try:
+    ret_code = subprocess.call(
+      ["docker", "buildx", "version"],
+      stdout=subprocess.DEVNULL,
+      stderr=subprocess.DEVNULL,
+    )
+  except OSError:
+    return False
+
+  return ret_code == 0
+
+
+def _build_env() -> Dict[str, str]:
+  """Returns the environment for `docker build`. This enables BuildKit if buildx
+  is available, unless the user has explicitly set DOCKER_BUILDKIT themselves.
+
+  """
+  env = dict(os.environ)
+  if "DOCKER_BUILDKIT" not in env and _buildx_available():
+    env["DOCKER_BUILDKIT"] = "1"
+
+  return env
+
+
+def _buildkit_enabled(env: Dict[str, str]) -> bool:
+  """Returns True if the supplied environment explicitly enables BuildKit for
+  `docker build`, False otherwise.
+
+  """
+  return env.get("DOCKER_BUILDKIT", "0").lower() not in ("0", "false")
+
+
+def _pull_cache_images(cache_from: List[str]) -> None:
+  """Attempts to pull each of the supplied images, so that `docker build` can
+  reuse their layers. Images that can't be pulled (the first build of some
+  project, say) are skipped.
+
+  """
+  for image in cache_from:
+    logging.info(f"Pulling {image} to use as a build cache.")
+    ret_code = subprocess.call(["docker", "pull", image])
+    if ret_code != 0:
+      logging.info(f"Couldn't pull {image}, skipping.")
+
+
+# Written to the build context when the user hasn't supplied their own
+# .dockerignore and the whole build path ends up in the image, so that VCS
+# metadata, caches and virtualenvs aren't sent to the Docker daemon (or hashed
+# into the code COPY layer) on every build.
+DEFAULT_DOCKERIGNORE = [
+  ".git",
+  ".venv",
+  "**/__pycache__",
+  "**/*.pyc",
+  "*.egg-info",
+]
+
+# Matches the source path of the COPY commands generated by copy_command.
+_COPY_SOURCE = re.compile(r"^COPY --chown=\S+ (\S+) \S+$", re.MULTILINE)
+
+
+def _dockerignore_entries(dockerfile: str) -> List[str]:
+  """Returns the .dockerignore patterns for a build of the supplied Dockerfile.
+
+  The build context only needs the paths the Dockerfile copies in, so
+  everything else is excluded; bytecode caches inside those paths are excluded
+  too. If the Dockerfile copies the entire build path, returns
+  DEFAULT_DOCKERIGNORE instead.
+
+  """
+  sources = dict.fromkeys(_COPY_SOURCE.findall(dockerfile))
+
+  if "." in sources:
+    return DEFAULT_DOCKERIGNORE
+
+  return ["*"] + [f"!{path}" for path in sources] + ["**/__pycache__", "**/*.pyc"]
+
 
-  return dockerfile
+# First line of every .dockerignore that caliban writes. A file that starts with
+# it was left behind by a build that never got to clean up, rather than written
+# by the user.
+_DOCKERIGNORE_MARKER = "# generated by caliban for the duration of a build."
+
+
+def _generated_dockerignore(path: str) -> bool:
+  """Returns True if the .dockerignore at path was written by caliban, False if
+  it belongs to the user.
+
+  """
+  with open(path) as f:
+    return f.readline().rstrip("\n") == _DOCKERIGNORE_MARKER
+
+
+@contextmanager
+def _default_dockerignore(build_path: str, entries: List[str]):
+  """Context manager that writes the supplied entries out to a .dockerignore file
+  in build_path for the duration of its scope, if build_path doesn't already
+  contain one. An existing .dockerignore is left untouched, unless it's a stale
+  file from an earlier caliban build, which gets replaced.
+
+  """
+  path = os.path.join(build_path, ".dockerignore")
+
+  if os.path.exists(path) and not _generated_dockerignore(path):
+    yield
+    return
+
+  with open(path, "w") as f:
+    f.write("\n".join([_DOCKERIGNORE_MARKER] + entries) + "\n")
+
+  try:
+    yield
+  finally:
+    if os.path.exists(path):
+      os.remove(path)
 
 
 def build_image(
@@ -699,19 +954,48 @@ def build_image(
   credentials_path: Optional[str] = None,
   adc_path: Optional[str] = None,
   no_cache: bool = False,
+  cache_from: Optional[List[str]] = None,
   **kwargs,
 ) -> str:
   """Builds a Docker image by generating a Dockerfile and passing it to `docker
   build` via stdin. All output from the `docker build` process prints to
   stdout.
 
+  If cache_from is supplied, each image in the list is passed to `docker build`
+  as a cache source (and, for non-BuildKit builds, pulled first if possible).
+  This lets builds on a fresh Docker daemon (CI, a new workstation) reuse layers
+  from previously pushed images.
+
+  If build_path has no .dockerignore, one that excludes every path the
+  Dockerfile doesn't copy is written for the duration of the build.
+
+  Builds use BuildKit if the buildx plugin is installed, unless
+  DOCKER_BUILDKIT=0 is set in the environment.
+  BuildKit builds embed inline cache metadata, so any image built here can
+  serve as a cache_from source.
+
   Returns the image ID of the new docker container; if the command fails,
   throws on error with information about the command and any issues that caused
   the problem.
 
   """
+  if cache_from is None:
+    cache_from = []
+
   caliban_config = kwargs.get("caliban_config", {})
 
+  env = _build_env()
+  buildkit = _buildkit_enabled(env)
+
+  # BuildKit reads cache layers straight from the registry, but the legacy
+  # builder can only use images that are present locally. Those get pulled in
+  # the background while the build context and Dockerfile are prepared.
+  cache_pull = None
+  if not buildkit and cache_from:
+    pull_pool = ThreadPoolExecutor(max_workers=1)
+    cache_pull = pull_pool.submit(_pull_cache_images, cache_from)
+    pull_pool.shutdown(wait=False)
+
   # Paths for resource files.
   sql_proxy_path = um.cloud_sql_proxy_path()
   launcher_path = um.launcher_path()
@@ -730,6 +1014,12 @@ def build_image(
         path=".", caliban_config=caliban_config
       ) as launcher_config:
         cache_args = ["--no-cache"] if no_cache else []
+        cache_args += [f"--cache-from={image}" for image in cache_from]
+
+        if buildkit:
+          # Embeds cache metadata in the built image, so that pushed images can
+          # act as a cache source for builds on other machines.
+          cache_args += ["--build-arg", "BUILDKIT_INLINE_CACHE=1"]
         cmd = (
           ["docker", "build", "--platform", "linux/amd64"]
           + cache_args
@@ -746,14 +1036,20 @@ def build_image(
             creds.get(launcher_path),
             launcher_config,
           ],
+          buildkit=buildkit,
           **kwargs,
         )
 
         joined_cmd = " ".join(cmd)
-        logging.info("Running command: {}".format(joined_cmd))
+        logging.info(f"Running command: {joined_cmd}")
+
+        if cache_pull is not None:
+          cache_pull.result()
 
         try:
-          _, ret_code = ufs.capture_stdout(cmd, input_str=dockerfile)
+          ignored = _dockerignore_entries(dockerfile)
+          with _default_dockerignore(build_path, ignored):
+            ret_code = ufs.stream_stdout(cmd, input_str=dockerfile, env=env)
           if ret_code == 0:
             image_id = None
             with open(id_file.name) as f:
@@ -761,7 +1057,7 @@ def build_image(
             return image_id
 
           else:
-            error_msg = "Docker failed with error code {}.".format(ret_code)
+            error_msg = f"Docker failed with error code {ret_code}."
             raise DockerError(error_msg, cmd, ret_code)
 
         except subprocess.CalledProcessError as e:
@@ -20,9 +20,22 @@ and notebooks in a Docker environment.
 
 import json
 import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Set, Tuple
 
 from absl import logging
 
+# (project_id, image_id) pairs known to exist in the container registry. Images
+# don't disappear from the registry mid-run, so positive answers are kept for
+# the life of the process; negative answers are always re-checked, since the
+# image may have been pushed in the meantime.
+_PUSHED: Set[Tuple[str, str]] = set()
+
+# background pushes share this pool, rather than starting a pool per push. Its
+# threads only start once a push is submitted, so importing this module stays
+# cheap.
+_PUSH_POOL = ThreadPoolExecutor(max_workers=4)
+
 
 def _image_tag_for_project(
   project_id: str, image_id: str, include_tag: bool = True
@@ -40,10 +53,12 @@ def _image_tag_for_project(
   return f"{base}:latest" if include_tag else base
 
 
-def _gcr_list_tags(project_id: str, image_id: str):
+def _gcr_list_tags(project_id: str, image_id: str, limit: Optional[int] = None):
   """Returns a sequence of metadata for all tags of the supplied image_id in the
   supplied project.
 
+  If limit is supplied, gcloud returns metadata for at most that many tags.
+
   """
   image_tag = _image_tag_for_project(project_id, image_id, include_tag=False)
   cmd = [
@@ -53,8 +68,11 @@ def _gcr_list_tags(project_id: str, image_id: str):
     "list-tags",
     f"--project={project_id}",
     "--format=json",
-    image_tag,
   ]
+  if limit is not None:
+    cmd.append(f"--limit={limit}")
+
+  cmd.append(image_tag)
   return json.loads(subprocess.check_output(cmd))
 
 
@@ -63,7 +81,15 @@ def gcr_image_pushed(project_id: str, image_id: str) -> bool:
   for the supplied project, false otherwise.
 
   """
-  return len(_gcr_list_tags(project_id, image_id)) > 0
+  if (project_id, image_id) in _PUSHED:
+    return True
+
+  # One tag is enough to know the image exists.
+  pushed = len(_gcr_list_tags(project_id, image_id, limit=1)) > 0
+  if pushed:
+    _PUSHED.add((project_id, image_id))
+
+  return pushed
 
 
 def push_uuid_tag(project_id: str, image_id: str, force: bool = False) -> str:
@@ -83,5 +109,26 @@ def push_uuid_tag(project_id: str, image_id: str, force: bool = False) -> str:
   if force or missing_remotely():
     subprocess.run(["docker", "tag", image_id, image_tag], check=True)
     subprocess.run(["docker", "push", image_tag], check=True)
+    _PUSHED.add((project_id, image_id))
 
   return image_tag
+
+
+def push_uuid_tag_async(
+  project_id: str, image_id: str, force: bool = False
+) -> Tuple[str, Future]:
+  """Version of push_uuid_tag that pushes the image on a background thread.
+
+  Returns a pair of
+
+  - the tag the image is being pushed to, and
+  - a future that resolves to that same tag once the push completes (or
+    raises if the push fails).
+
+  The push runs independently of the caller. If the caller fails before it
+  waits on the future (a failed job submission, say), the push still runs to
+  completion, and the interpreter waits for it before exiting.
+
+  """
+  push = _PUSH_POOL.submit(push_uuid_tag, project_id, image_id, force)
+  return _image_tag_for_project(project_id, image_id), push
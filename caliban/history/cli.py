@@ -16,14 +16,14 @@
 """caliban history cli support"""
 
 import logging
-import os
+from itertools import groupby
 from typing import Any, Dict, Iterable, List, Optional
 
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from caliban.docker.build import build_image
-from caliban.docker.push import push_uuid_tag
+from caliban.docker.push import push_uuid_tag_async
 from caliban.history.submit import submit_job_specs
 from caliban.history.types import (
   ContainerSpec,
@@ -39,10 +39,10 @@ from caliban.history.util import (
   replace_job_spec_image,
   session_scope,
   stop_job,
-  update_job_status,
+  update_job_statuses,
 )
 from caliban.platform.gke.util import credentials, user_verify
-from caliban.util import Package, current_user
+from caliban.util import Package, current_user, home_dir
 
 # default max jobs to return for status command
 _DEFAULT_STATUS_MAX_JOBS = 8
@@ -50,8 +50,12 @@ _DEFAULT_STATUS_MAX_JOBS = 8
 
 # ----------------------------------------------------------------------------
 def _job_str(j: Job) -> str:
-  """returns a job string for cli commands"""
-  s = f"{j.id:<8d} {update_job_status(j):9s} {j.spec.platform.name:>8s} "
+  """returns a job string for cli commands
+
+  This reports the job's stored status; refresh it first with
+  update_job_statuses.
+  """
+  s = f"{j.id:<8d} {j.status:9s} {j.spec.platform.name:>8s} "
   s += f"{str(j.created):.19s} container: {j.container} "
   if j.spec.platform == Platform.CAIP:
     s += f'name: {j.details["jobId"]}'
@@ -73,7 +77,7 @@ def _container_spec_str(cs: ContainerSpec) -> str:
   """returns container spec string for cli commands"""
   build_path = cs.spec.get("build_path")
   if build_path is not None:
-    build_path = build_path.replace(os.path.expanduser("~"), "~")
+    build_path = build_path.replace(home_dir(), "~")
   return (
     f'{cs.id}: job_mode: {cs.spec.get("job_mode", "GPU")}, '
     f'build url: {build_path}, '
@@ -86,27 +90,25 @@ def _display_jobs_hierarchy(jobs: Iterable[Job]) -> None:
   """displays jobs in a hierarchical format using experiment groups, container
   specs, and experiments"""
 
-  xgroups = sorted(set([j.experiment.xgroup for j in jobs]), key=lambda x: x.id)
+  # a single stable sort groups the jobs at every level while keeping their
+  # original order within each experiment.
+  jobs = sorted(
+    jobs,
+    key=lambda j: (
+      j.experiment.xgroup.id,
+      j.experiment.container_spec.id,
+      j.experiment.id,
+    ),
+  )
 
-  for xg in xgroups:
+  for xg, xg_jobs in groupby(jobs, key=lambda j: j.experiment.xgroup):
     logging.info(f"xgroup {xg.name}:")
-    xg_jobs = list(filter(lambda j: j.experiment.xgroup == xg, jobs))
-    container_specs = sorted(
-      set([x.experiment.container_spec for x in xg_jobs]),
-      key=lambda x: x.id,
-    )
 
-    for cs in container_specs:
+    for cs, cs_jobs in groupby(xg_jobs, key=lambda j: j.experiment.container_spec):
       logging.info(f"docker config {_container_spec_str(cs)}")
-      cs_jobs = list(filter(lambda j: (j.experiment.container_spec == cs), xg_jobs))
-      experiments = sorted(
-        set([x.experiment for x in cs_jobs]),
-        key=lambda x: x.id,
-      )
 
-      for e in experiments:
+      for e, exp_jobs in groupby(cs_jobs, key=lambda j: j.experiment):
         logging.info(f"  experiment id {e.id}: {_experiment_command_str(e)}")
-        exp_jobs = filter(lambda x: x.experiment == e, cs_jobs)
 
         for j in exp_jobs:
           logging.info(f"    job {_job_str(j)}")
@@ -129,8 +131,17 @@ def _display_recent_jobs(
   max_jobs = max(0, max_jobs)
 
   with session_scope(get_sql_engine()) as session:
+    # everything the hierarchy displays is loaded up front, rather than with
+    # a query per job.
     recent_jobs = (
-      session.query(Job).filter(Job.user == user).order_by(Job.created.desc())
+      session.query(Job)
+      .options(
+        joinedload(Job.spec),
+        joinedload(Job.experiment).joinedload(Experiment.xgroup),
+        joinedload(Job.experiment).joinedload(Experiment.container_spec),
+      )
+      .filter(Job.user == user)
+      .order_by(Job.created.desc())
     )
 
     if max_jobs > 0:
@@ -148,6 +159,7 @@ def _display_recent_jobs(
     else:
       logging.info(f"all jobs for user {user}:\n")
 
+    update_job_statuses(recent_jobs)
     _display_jobs_hierarchy(jobs=recent_jobs)
 
     return
@@ -186,6 +198,8 @@ def _display_xgroup(
       key=lambda x: x.id,
     )
 
+    update_job_statuses(j for e in xg.experiments for j in e.jobs[-max_jobs:])
+
     logging.info(f"xgroup {xg.name}:")
     for cs in container_specs:
       logging.info(f"docker config {_container_spec_str(cs)}")
@@ -246,6 +260,8 @@ def stop(args: Dict[str, Any]) -> None:
       logging.info("no running jobs found")
       return
 
+    update_job_statuses(running_jobs)
+
     logging.info("the following jobs will be stopped:")
     for j in running_jobs:
       logging.info(_experiment_command_str(j.experiment))
@@ -259,7 +275,7 @@ def stop(args: Dict[str, Any]) -> None:
 
     for j in running_jobs:
       logging.info(f"stopping job: {_job_str(j)}")
-      stop_job(j)
+      stop_job(j, update_status=False)
 
     logging.info(
       "requested job cancellation, please be patient as it may take "
@@ -287,7 +303,11 @@ def _rebuild_containers(
   """
 
   image_id_map = {}
+  pushes = []
 
+  # builds run one at a time, as each stages its credentials and launcher
+  # files under fixed names in the working directory. pushes share no such
+  # state, so each one uploads in the background while the next image builds.
   container_specs = set([j.experiment.container_spec for j in jobs])
   for c in container_specs:
     image_id = build_image(**c.spec)
@@ -299,11 +319,16 @@ def _rebuild_containers(
         assert project_id is not None, "project id must be specified for CAIP, GKE jobs"
 
         if image_tag is None:
-          image_tag = push_uuid_tag(project_id, image_id)
+          image_tag, push = push_uuid_tag_async(project_id, image_id)
+          pushes.append(push)
         image_id_map[j] = image_tag
       else:
         image_id_map[j] = image_id
 
+  # surfaces the first failed push, if any.
+  for push in pushes:
+    push.result()
+
   return image_id_map
 
 
@@ -329,12 +354,7 @@ def _get_resubmit_project_id(
   if project_id is not None:
     return project_id
 
-  cloud_jobs = filter(
-    lambda j: j.spec.platform in [Platform.CAIP, Platform.GKE],
-    jobs,
-  )
-
-  if len(list(cloud_jobs)) == 0:
+  if not any(j.spec.platform in [Platform.CAIP, Platform.GKE] for j in jobs):
     return project_id
 
   return credentials(creds_file).project_id
@@ -373,13 +393,11 @@ def _get_resubmit_jobs(
     logging.error("no jobs found in experiment group")
     return None
 
+  update_job_statuses(jobs)
+
   # we are only resubmitting stopped or failed jobs
   if not all_jobs:
-    jobs = list(
-      filter(
-        lambda x: update_job_status(x) in [JobStatus.FAILED, JobStatus.STOPPED], jobs
-      )
-    )
+    jobs = [j for j in jobs if j.status in [JobStatus.FAILED, JobStatus.STOPPED]]
 
   if len(jobs) == 0:
     logging.error("no jobs found in FAILED or STOPPED state")
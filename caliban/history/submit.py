@@ -18,7 +18,6 @@
 from typing import List, Optional
 
 import caliban.platform.cloud.core as cloud
-import caliban.platform.gke.cli as gke_cli
 import caliban.platform.run as r
 from caliban.history.types import JobSpec, Platform
 
@@ -47,6 +46,10 @@ def submit_job_specs(
     )
 
   if platform == Platform.GKE:
+    # imported lazily, so that submitting to other platforms doesn't pay for
+    # importing kubernetes.
+    import caliban.platform.gke.cli as gke_cli
+
     return gke_cli.submit_job_specs(
       args={
         "cloud_key": credentials_path,
@@ -18,7 +18,8 @@ import os
 import sys
 from contextlib import contextmanager
 from copy import deepcopy
-from typing import Any, Dict, List, Optional
+from itertools import groupby
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
 
 from absl import logging
 from blessings import Terminal
@@ -29,6 +30,8 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, sessionmaker
 
 import caliban.config.experiment as ce
+import caliban.platform.gke.constants as gke_k
+import caliban.platform.gke.util as gke_util
 import caliban.util.auth as ua
 from caliban.history.types import (
   ContainerSpec,
@@ -41,14 +44,41 @@ from caliban.history.types import (
   init_db,
 )
 from caliban.platform.cloud.types import JobStatus as CloudStatus
-from caliban.platform.gke.cluster import Cluster
 from caliban.platform.gke.types import JobStatus as GkeStatus
-from caliban.platform.gke.util import default_credentials
+
+# the gke cluster module pulls in kubernetes, which is slow to import; it's only
+# needed to check on gke jobs.
+if TYPE_CHECKING:
+  from caliban.platform.gke.cluster import Cluster
 
 DB_URL_ENV = "CALIBAN_DB_URL"
 MEMORY_DB_URL = "sqlite:///:memory:"
 SQLITE_FILE_DB_URL = "sqlite:///~/.caliban/caliban.db"
 
+# https://cloud.google.com/ai-platform/training/docs/reference/rest/v1/projects.jobs#State
+_CAIP_TO_JOB_STATUS = {
+  CloudStatus.STATE_UNSPECIFIED: JobStatus.UNKNOWN,
+  CloudStatus.QUEUED: JobStatus.SUBMITTED,
+  CloudStatus.PREPARING: JobStatus.SUBMITTED,
+  CloudStatus.RUNNING: JobStatus.RUNNING,
+  CloudStatus.SUCCEEDED: JobStatus.SUCCEEDED,
+  CloudStatus.FAILED: JobStatus.FAILED,
+  CloudStatus.CANCELLING: JobStatus.RUNNING,
+  CloudStatus.CANCELLED: JobStatus.STOPPED,
+}
+
+_GKE_TO_JOB_STATUS = {
+  GkeStatus.STATE_UNSPECIFIED: JobStatus.SUBMITTED,
+  GkeStatus.PENDING: JobStatus.SUBMITTED,
+  GkeStatus.RUNNING: JobStatus.RUNNING,
+  GkeStatus.FAILED: JobStatus.FAILED,
+  GkeStatus.SUCCEEDED: JobStatus.SUCCEEDED,
+  GkeStatus.UNAVAILABLE: JobStatus.UNKNOWN,
+}
+
+# google's api batch endpoints accept at most this many requests per batch.
+_CAIP_MAX_BATCH_SIZE = 1000
+
 t = Terminal()
 
 
@@ -251,13 +281,33 @@ def _get_caip_job_name(j: Job) -> str:
 
 
 # ----------------------------------------------------------------------------
-def _get_caip_job_api(credentials_path: Optional[str] = None) -> Any:
+def _get_caip_service(credentials_path: Optional[str] = None) -> Any:
   credentials = ua.gcloud_credentials(credentials_path)
-  return (
-    discovery.build("ml", "v1", cache_discovery=False, credentials=credentials)
-    .projects()
-    .jobs()
-  )
+  return discovery.build("ml", "v1", cache_discovery=False, credentials=credentials)
+
+
+# ----------------------------------------------------------------------------
+def _get_caip_job_api(credentials_path: Optional[str] = None) -> Any:
+  return _get_caip_service(credentials_path).projects().jobs()
+
+
+# ----------------------------------------------------------------------------
+def _caip_job_status(j: Job, rsp: Optional[Dict[str, Any]]) -> JobStatus:
+  """converts a caip job resource for the given job into a JobStatus
+
+  Args:
+  j: job
+  rsp: caip job resource, or None if it couldn't be fetched
+
+  Returns:
+  JobStatus"""
+  try:
+    caip_status = CloudStatus[rsp["state"]]
+  except Exception:
+    logging.error(f"error getting job status for {j.details['jobId']}")
+    return JobStatus.UNKNOWN
+
+  return _CAIP_TO_JOB_STATUS.get(caip_status) or JobStatus.UNKNOWN
 
 
 # ----------------------------------------------------------------------------
@@ -269,29 +319,44 @@ def get_caip_job_status(j: Job) -> JobStatus:
   Returns:
   JobStatus"""
 
-  CAIP_TO_JOB_STATUS = {
-    CloudStatus.STATE_UNSPECIFIED: JobStatus.UNKNOWN,
-    CloudStatus.QUEUED: JobStatus.SUBMITTED,
-    CloudStatus.PREPARING: JobStatus.SUBMITTED,
-    CloudStatus.RUNNING: JobStatus.RUNNING,
-    CloudStatus.SUCCEEDED: JobStatus.SUCCEEDED,
-    CloudStatus.FAILED: JobStatus.FAILED,
-    CloudStatus.CANCELLING: JobStatus.RUNNING,
-    CloudStatus.CANCELLED: JobStatus.STOPPED,
-  }
-
   api = _get_caip_job_api()
-  job_id = j.details["jobId"]
-  name = _get_caip_job_name(j)
 
   try:
-    rsp = api.get(name=name).execute()
-    caip_status = CloudStatus[rsp["state"]]
+    rsp = api.get(name=_get_caip_job_name(j)).execute()
   except Exception:
-    logging.error(f"error getting job status for {job_id}")
-    return JobStatus.UNKNOWN
+    rsp = None
+
+  return _caip_job_status(j, rsp)
+
+
+# ----------------------------------------------------------------------------
+def _update_caip_job_statuses(jobs: List[Job]) -> None:
+  """updates the status of each of the given caip jobs, fetching them in
+  batches rather than with a request per job
 
-  return CAIP_TO_JOB_STATUS.get(caip_status) or JobStatus.UNKNOWN
+  https://github.com/googleapis/google-api-python-client/blob/main/docs/batch.md
+  """
+  if len(jobs) == 0:
+    return
+
+  service = _get_caip_service()
+  api = service.projects().jobs()
+
+  def update(request_id, rsp, exception):
+    j = jobs[int(request_id)]
+    j.status = _caip_job_status(j, rsp if exception is None else None)
+
+  for start in range(0, len(jobs), _CAIP_MAX_BATCH_SIZE):
+    batch = service.new_batch_http_request(callback=update)
+    for i in range(start, min(start + _CAIP_MAX_BATCH_SIZE, len(jobs))):
+      batch.add(api.get(name=_get_caip_job_name(jobs[i])), request_id=str(i))
+
+    try:
+      batch.execute()
+    except Exception as e:
+      logging.error(f"error getting caip job statuses: {e}")
+      for j in jobs[start : start + _CAIP_MAX_BATCH_SIZE]:
+        j.status = JobStatus.UNKNOWN
 
 
 # ----------------------------------------------------------------------------
@@ -301,16 +366,18 @@ def get_gke_job_name(j: Job) -> str:
 
 
 # ----------------------------------------------------------------------------
-def get_job_cluster(j: Job) -> Optional[Cluster]:
+def get_job_cluster(j: Job) -> Optional["Cluster"]:
   """gets the cluster name from a Job object"""
   if j.spec.platform != Platform.GKE:
     return None
 
+  from caliban.platform.gke.cluster import Cluster
+
   return Cluster.get(
     name=j.details["cluster_name"],
     project_id=j.details["project_id"],
     zone=j.details["cluster_zone"],
-    creds=default_credentials().credentials,
+    creds=gke_util.credentials().credentials,
   )
 
 
@@ -325,15 +392,6 @@ def get_gke_job_status(j: Job) -> JobStatus:
   JobStatus
   """
 
-  GKE_TO_JOB_STATUS = {
-    GkeStatus.STATE_UNSPECIFIED: JobStatus.SUBMITTED,
-    GkeStatus.PENDING: JobStatus.SUBMITTED,
-    GkeStatus.RUNNING: JobStatus.RUNNING,
-    GkeStatus.FAILED: JobStatus.FAILED,
-    GkeStatus.SUCCEEDED: JobStatus.SUCCEEDED,
-    GkeStatus.UNAVAILABLE: JobStatus.UNKNOWN,
-  }
-
   cluster_name = j.details["cluster_name"]
   job_name = get_gke_job_name(j)
 
@@ -352,7 +410,74 @@ def get_gke_job_status(j: Job) -> JobStatus:
     )
     return JobStatus.UNKNOWN
 
-  return GKE_TO_JOB_STATUS[GkeStatus.from_job_info(job_info)]
+  return _GKE_TO_JOB_STATUS[GkeStatus.from_job_info(job_info)]
+
+
+# ----------------------------------------------------------------------------
+def _list_gke_jobs(cluster: "Cluster", jobs: List[Job]) -> Dict[str, Any]:
+  """lists the given gke jobs on their cluster, returning a dict of job name
+  => V1Job for each one the cluster knows about
+
+  Rather than listing every job in every namespace, this lists only the
+  namespaces the given jobs were submitted to, and selects a lone job in a
+  namespace by name.
+  """
+
+  def namespace(j: Job) -> str:
+    return j.details["job"]["metadata"].get("namespace", gke_k.DEFAULT_NAMESPACE)
+
+  job_infos = {}
+  for ns, ns_jobs in groupby(sorted(jobs, key=namespace), key=namespace):
+    names = {get_gke_job_name(j) for j in ns_jobs}
+
+    field_selector = None
+    if len(names) == 1:
+      field_selector = f"metadata.name={next(iter(names))}"
+
+    for x in cluster.jobs(namespace=ns, field_selector=field_selector) or []:
+      if x.metadata.name in names:
+        job_infos[x.metadata.name] = x
+
+  return job_infos
+
+
+# ----------------------------------------------------------------------------
+def _update_gke_job_statuses(jobs: List[Job]) -> None:
+  """updates the status of each of the given gke jobs, connecting to and
+  listing the jobs of each cluster once rather than once per job"""
+
+  def cluster_key(j: Job):
+    return (
+      j.details["project_id"],
+      j.details["cluster_zone"],
+      j.details["cluster_name"],
+    )
+
+  for (_, _, cluster_name), cluster_jobs in groupby(
+    sorted(jobs, key=cluster_key), key=cluster_key
+  ):
+    cluster_jobs = list(cluster_jobs)
+
+    cluster = get_job_cluster(cluster_jobs[0])
+    if cluster is None:
+      logging.error(
+        f"unable to connect to cluster {cluster_name}, so unable to update run status"
+      )
+      job_infos = {}
+    else:
+      job_infos = _list_gke_jobs(cluster, cluster_jobs)
+
+    for j in cluster_jobs:
+      job_info = job_infos.get(get_gke_job_name(j))
+      if job_info is None:
+        if cluster is not None:
+          logging.error(
+            f"unable to get job info for {get_gke_job_name(j)} from cluster "
+            f"{cluster_name}, so unable to update run status"
+          )
+        j.status = JobStatus.UNKNOWN
+      else:
+        j.status = _GKE_TO_JOB_STATUS[GkeStatus.from_job_info(job_info)]
 
 
 # ----------------------------------------------------------------------------
@@ -380,6 +505,20 @@ def update_job_status(j: Job) -> JobStatus:
   assert False, "can't get job status for platform {j.platform.name}"
 
 
+# ----------------------------------------------------------------------------
+def update_job_statuses(jobs: Iterable[Job]) -> None:
+  """updates the status of each of the given jobs
+
+  This has the same effect as calling update_job_status on each job, but
+  fetches remote statuses with a batched request per caip batch, or a single
+  listing per gke cluster, rather than with a round trip per job.
+  """
+  pending = [j for j in jobs if j.status is None or not j.status.is_terminal()]
+
+  _update_caip_job_statuses([j for j in pending if j.spec.platform == Platform.CAIP])
+  _update_gke_job_statuses([j for j in pending if j.spec.platform == Platform.GKE])
+
+
 # ----------------------------------------------------------------------------
 def _stop_caip_job(j: Job) -> bool:
   """stops a running caip job
@@ -446,17 +585,19 @@ def _stop_gke_job(j: Job) -> bool:
 
 
 # ----------------------------------------------------------------------------
-def stop_job(j: Job) -> bool:
+def stop_job(j: Job, update_status: bool = True) -> bool:
   """stops a running job
 
   Args:
   j: job to stop
+  update_status: if False, trust j.status rather than fetching the job's
+    current status, e.g. when it was just refreshed with update_job_statuses
 
   Returns:
   True on success, False otherwise
   """
 
-  current_status = update_job_status(j)
+  current_status = update_job_status(j) if update_status else j.status
 
   if current_status not in [JobStatus.RUNNING, JobStatus.SUBMITTED]:
     return True
@@ -29,8 +29,6 @@ import caliban.docker.build as b
 import caliban.history.cli
 import caliban.platform.cloud.core as cloud
 import caliban.platform.cloud.util as cu
-import caliban.platform.gke as gke
-import caliban.platform.gke.cli
 import caliban.platform.notebook as pn
 import caliban.platform.run as pr
 import caliban.platform.shell as ps
@@ -51,7 +49,10 @@ def run_app(arg_input):
   command = args["command"]
 
   if command == "cluster":
-    return gke.cli.run_cli_command(args)
+    # only cluster commands need the gke cli, and with it kubernetes.
+    import caliban.platform.gke.cli as gke_cli
+
+    return gke_cli.run_cli_command(args)
 
   job_mode = cli.resolve_job_mode(args)
   docker_args = cli.generate_docker_args(job_mode, args)
@@ -114,6 +115,7 @@ def run_app(arg_input):
       dry_run=dry_run,
       package=package,
       xgroup=xgroup,
+      parallelism=args.get("parallelism", 1),
       **docker_args,
     )
 
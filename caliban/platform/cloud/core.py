@@ -19,6 +19,7 @@ from __future__ import absolute_import, division, print_function
 
 import datetime
 import traceback
+from concurrent.futures import Future
 from copy import deepcopy
 from pprint import pformat
 from typing import Any, Dict, Iterable, List, Optional, Tuple
@@ -510,6 +511,29 @@ def build_job_specs(
   )
 
 
+def start_image_push(
+  project_id, docker_args, dry_run: bool = False
+) -> Tuple[str, Optional[Future]]:
+  """Generates a new Docker image and starts pushing it to the user's GCloud
+  Container Repository in the background, tagged using the UUID of the
+  generated image.
+
+  Returns the image's tag, along with a future that resolves once the push
+  completes. If dry_run is true, logs the Docker image build parameters and
+  returns a bogus tag and no future.
+
+  """
+  logging.info("Generating Docker image with parameters:")
+  logging.info(t.yellow(pformat(docker_args)))
+
+  if dry_run:
+    logging.info("Dry run - skipping actual 'docker build' and 'docker push'.")
+    return "dry_run_tag", None
+
+  image_id = db.build_image(**docker_args)
+  return dp.push_uuid_tag_async(project_id, image_id)
+
+
 def generate_image_tag(project_id, docker_args, dry_run: bool = False):
   """Generates a new Docker image and pushes an image to the user's GCloud
   Container Repository, tagged using the UUID of the generated image.
@@ -518,15 +542,10 @@ def generate_image_tag(project_id, docker_args, dry_run: bool = False):
   bogus tag.
 
   """
-  logging.info("Generating Docker image with parameters:")
-  logging.info(t.yellow(pformat(docker_args)))
+  image_tag, push = start_image_push(project_id, docker_args, dry_run=dry_run)
 
-  if dry_run:
-    logging.info("Dry run - skipping actual 'docker build' and 'docker push'.")
-    image_tag = "dry_run_tag"
-  else:
-    image_id = db.build_image(**docker_args)
-    image_tag = dp.push_uuid_tag(project_id, image_id)
+  if push is not None:
+    push.result()
 
   return image_tag
 
@@ -664,8 +683,11 @@ def submit_ml_job(
   with session_scope(engine) as session:
     container_spec = generate_container_spec(session, docker_args, image_tag)
 
+    # The push runs while the experiments are recorded; jobs are only submitted
+    # once it has finished.
+    push = None
     if image_tag is None:
-      image_tag = generate_image_tag(project_id, docker_args, dry_run=dry_run)
+      image_tag, push = start_image_push(project_id, docker_args, dry_run=dry_run)
 
     experiments = create_experiments(
       session=session,
@@ -690,6 +712,9 @@ def submit_ml_job(
     if dry_run:
       return execute_dry_run(specs)
 
+    if push is not None:
+      push.result()
+
     try:
       submit_job_specs(
         specs=specs,
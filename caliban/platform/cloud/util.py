@@ -16,6 +16,7 @@
 """
 Utilities relevant to AI Platform.
 """
+import functools
 import re
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -25,6 +26,9 @@ import caliban.util.argparse as ua
 # key and value for labels can be at most this-many-characters long.
 AI_PLATFORM_MAX_LABEL_LENGTH = 63
 
+# characters that aren't allowed in a label.
+_INVALID_LABEL_CHARS = re.compile(r"[^a-z0-9_-]")
+
 
 def _truncate(s: str, max_length: int) -> str:
   """Returns the input string s truncated to be at most max_length characters
@@ -34,12 +38,16 @@ def _truncate(s: str, max_length: int) -> str:
   return s if len(s) <= max_length else s[0:max_length]
 
 
+@functools.lru_cache(maxsize=None)
 def _clean_label(s: Optional[str], is_key: bool) -> str:
   """Processes the string into the sanitized format required by AI platform
   labels.
 
   https://cloud.google.com/ml-engine/docs/resource-labels
 
+  Every job in an experiment group shares most of its labels, so results are
+  cached.
+
   """
   if s is None:
     return ""
@@ -51,7 +59,7 @@ def _clean_label(s: Optional[str], is_key: bool) -> str:
 
   # lowercase, letters, - and _ are valid, so strip the leading dashes, make
   # everything lowercase and then kill any remaining unallowed characters.
-  cleaned = re.sub(r"[^a-z0-9_-]", "", s.lower()).lstrip("-")
+  cleaned = _INVALID_LABEL_CHARS.sub("", s.lower()).lstrip("-")
 
   # Keys must start with a letter. If is_key is set and the cleaned version
   # starts with something else, append `k`.
@@ -117,4 +125,10 @@ def sanitize_labels(
   if isinstance(pairs, dict):
     return sanitize_labels(pairs.items())
 
-  return {key_label(k): value_label(v) for (k, v) in pairs if key_label(k)}
+  ret = {}
+  for k, v in pairs:
+    clean_k = key_label(k)
+    if clean_k:
+      ret[clean_k] = value_label(v)
+
+  return ret
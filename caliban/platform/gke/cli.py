@@ -20,7 +20,7 @@ import logging
 import os
 import pprint as pp
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import googleapiclient
 from google.auth.credentials import Credentials
@@ -43,6 +43,17 @@ from caliban.history.util import (
 from caliban.platform.cloud.core import generate_image_tag
 from caliban.platform.gke.cluster import Cluster
 
+# column layout for node pool listings.
+_NODE_POOL_FMT = "%-20s%-20s%-40s%-20s"
+
+
+# ----------------------------------------------------------------------------
+def _log_lines(lines: Iterable[str]) -> None:
+  """logs the given lines as a single message, rather than one per line"""
+  msg = "\n".join(lines)
+  if msg:
+    logging.info(msg)
+
 
 # ----------------------------------------------------------------------------
 def _project_and_creds(fn):
@@ -166,16 +177,18 @@ def _cluster_create(args: dict, project_id: str, creds: Credentials) -> None:
     logging.error("error building cluster client")
     return
 
-  request = Cluster.create_request(
+  create_request = Cluster.create_request(
     cluster_client, creds, cluster_name, project_id, zone, release_channel, single_zone
   )
 
-  if request is None:
+  if create_request is None:
     logging.error("error creating cluster creation request")
     return
 
+  request, request_body = create_request
+
   if dry_run:
-    logging.info("request:\n{}".format(pp.pformat(json.loads(request.body))))
+    logging.info("request:\n{}".format(pp.pformat(request_body)))
     return
 
   # --------------------------------------------------------------------------
@@ -243,9 +256,8 @@ def _cluster_ls(args: dict, project_id: str, creds: Credentials) -> None:
     logging.error(cluster_name)
     return
 
-  logging.info("{} clusters found".format(len(clusters)))
-  for c in clusters:
-    logging.info(c)
+  logging.info("%d clusters found", len(clusters))
+  _log_lines(clusters)
 
   return
 
@@ -270,19 +282,23 @@ def _node_pool_ls(args: dict, cluster: Cluster) -> None:
     logging.info("no node pools found")
     return
 
-  FMT = "%-20s%-20s%-40s%-20s"
-  logging.info(FMT, "NAME", "MACHINE TYPE", "ACCELERATORS", "MAX NODES")
-  for p in np:
+  def row(p):
     accel = ",".join(
       [
         "%s(%d)" % (a.accelerator_type, a.accelerator_count)
         for a in p.config.accelerators
       ]
     )
-    logging.info(
-      FMT % (p.name, p.config.machine_type, accel, p.autoscaling.max_node_count)
+    return _NODE_POOL_FMT % (
+      p.name,
+      p.config.machine_type,
+      accel,
+      p.autoscaling.max_node_count,
     )
 
+  header = _NODE_POOL_FMT % ("NAME", "MACHINE TYPE", "ACCELERATORS", "MAX NODES")
+  _log_lines([header] + [row(p) for p in np])
+
   return
 
 
@@ -300,9 +316,8 @@ def _pod_ls(args: dict, cluster: Cluster):
   if pods is None:
     return
 
-  logging.info("{} pods found".format(len(pods)))
-  for p in pods:
-    logging.info(p.metadata.name)
+  logging.info("%d pods found", len(pods))
+  _log_lines(p.metadata.name for p in pods)
 
   return
 
@@ -322,9 +337,8 @@ def _job_ls(args: dict, cluster: Cluster):
   if jobs is None:
     return
 
-  logging.info("{} jobs found".format(len(jobs)))
-  for j in jobs:
-    logging.info(j.metadata.name)
+  logging.info("%d jobs found", len(jobs))
+  _log_lines(j.metadata.name for j in jobs)
 
   return
 
@@ -475,13 +489,12 @@ def _job_submit(args: dict, cluster: Cluster) -> None:
         print("error exporting jobs to {}".format(export))
       return
 
-    for s in specs:
-      try:
-        cluster.submit_job(job_spec=s, name=job_name, labels=labels)
-      except Exception as e:
-        logging.error(f"exception: {e}")
-        session.commit()  # commit here, otherwise will be rolled back
-        return
+    try:
+      cluster.submit_jobs([(s, job_name) for s in specs], labels=labels)
+    except Exception as e:
+      logging.error(f"exception: {e}")
+      session.commit()  # commit here, otherwise will be rolled back
+      return
 
   # --------------------------------------------------------------------------
   logging.info(f"jobs submitted, visit {cluster.dashboard_url()} to monitor")
@@ -570,6 +583,7 @@ def submit_job_specs(
   """
   job_specs = args.get("specs", [])
 
-  for s in job_specs:
-    name = s.spec["template"]["spec"]["containers"][0]["name"]
-    cluster.submit_job(job_spec=s, name=name)
+  def name(s):
+    return s.spec["template"]["spec"]["containers"][0]["name"]
+
+  cluster.submit_jobs([(s, name(s)) for s in job_specs])
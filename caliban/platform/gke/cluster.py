@@ -18,6 +18,7 @@
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import googleapiclient
@@ -45,7 +46,6 @@ from kubernetes.client import (
   V1ResourceRequirements,
   V1Toleration,
 )
-from kubernetes.client.api_client import ApiClient
 
 import caliban.config.experiment as ce
 import caliban.platform.gke.constants as k
@@ -518,28 +518,40 @@ class Cluster(object):
     if self._core_api is None:
       return None
 
-    # this returns a V1PodList
-    rsp = self._core_api.list_pod_for_all_namespaces(watch=False)
-
-    cluster_pods = [
-      p for p in rsp.items if p.metadata.namespace != k.KUBE_SYSTEM_NAMESPACE
-    ]
-
-    return cluster_pods
+    # this returns a V1PodList. kube-system pods are filtered out by the api
+    # server, so they never cross the wire.
+    return self._core_api.list_pod_for_all_namespaces(
+      watch=False, field_selector=f"metadata.namespace!={k.KUBE_SYSTEM_NAMESPACE}"
+    ).items
 
   # --------------------------------------------------------------------------
   @trap(None)
   @connected(None)
-  def jobs(self) -> Optional[List[V1Job]]:
+  def jobs(
+    self,
+    namespace: Optional[str] = None,
+    field_selector: Optional[str] = None,
+  ) -> Optional[List[V1Job]]:
     """gets a list of jobs for this cluster
 
+    Args:
+    namespace: only list jobs in this namespace, None lists all namespaces
+    field_selector: only list jobs matching this kubernetes field selector
+
     Returns:
     list of V1Job instances on success, None otherwise
     """
     if self._batch_api is None:
       return None
 
-    return self._batch_api.list_job_for_all_namespaces(watch=False).items
+    if namespace is None:
+      return self._batch_api.list_job_for_all_namespaces(
+        watch=False, field_selector=field_selector
+      ).items
+
+    return self._batch_api.list_namespaced_job(
+      namespace, watch=False, field_selector=field_selector
+    ).items
 
   # --------------------------------------------------------------------------
   @trap(None)
@@ -677,25 +689,71 @@ class Cluster(object):
     """submits a job to the cluster based on the given job spec"""
 
     v1job = self.create_v1job(job_spec=job_spec, name=name, labels=labels)
-    submitted = self.submit_v1job(v1job)
-    container = job_spec.spec["template"]["spec"]["containers"][0]["image"]
+    return self._job_record(job_spec, self.submit_v1job(v1job))
 
-    if submitted is not None:
-      details = {
-        "cluster_name": self.name,
-        "project_id": self.project_id,
-        "cluster_zone": self.zone,
-        "job": ApiClient().sanitize_for_serialization(submitted),
-      }
+  # --------------------------------------------------------------------------
+  @connected(None)
+  def submit_jobs(
+    self,
+    jobs: Iterable[Tuple[JobSpec, str]],
+    labels: Optional[Dict[str, str]] = None,
+    max_workers: int = k.MAX_SUBMIT_WORKERS,
+  ) -> Optional[List[Optional[Job]]]:
+    """submits jobs to the cluster concurrently
 
-      return Job(
-        spec=job_spec,
-        container=container,
-        details=details,
-        status=JobStatus.SUBMITTED,
-      )
+    The kubernetes api calls run on a pool of max_workers threads. Job records
+    are created on the calling thread, as they attach to the caller's
+    history session.
 
-    return None
+    Args:
+    jobs: (job spec, job name) pairs to submit
+    labels: labels to apply to every job
+    max_workers: maximum number of concurrent submissions
+
+    Returns:
+    list of Job records in the order supplied, None for any job that failed to
+    submit
+    """
+
+    specs, v1jobs = [], []
+    for job_spec, name in jobs:
+      specs.append(job_spec)
+      v1jobs.append(self.create_v1job(job_spec=job_spec, name=name, labels=labels))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+      submitted = list(pool.map(self.submit_v1job, v1jobs))
+
+    return [self._job_record(s, j) for s, j in zip(specs, submitted)]
+
+  # --------------------------------------------------------------------------
+  def _job_record(self, job_spec: JobSpec, submitted: Optional[V1Job]) -> Optional[Job]:
+    """creates the Job record for a submitted kubernetes job
+
+    Args:
+    job_spec: spec the job was created from
+    submitted: job returned by the kubernetes api, None if submission failed
+
+    Returns:
+    Job on success, None otherwise
+    """
+
+    if submitted is None:
+      return None
+
+    container = job_spec.spec["template"]["spec"]["containers"][0]["image"]
+    details = {
+      "cluster_name": self.name,
+      "project_id": self.project_id,
+      "cluster_zone": self.zone,
+      "job": util._api_client().sanitize_for_serialization(submitted),
+    }
+
+    return Job(
+      spec=job_spec,
+      container=container,
+      details=details,
+      status=JobStatus.SUBMITTED,
+    )
 
   # --------------------------------------------------------------------------
   @connected(None)
@@ -824,7 +882,7 @@ class Cluster(object):
 
     return JobSpec.get_or_create(
       experiment=experiment,
-      spec=ApiClient().sanitize_for_serialization(job_spec),
+      spec=util._api_client().sanitize_for_serialization(job_spec),
       platform=Platform.GKE,
     )
 
@@ -1177,7 +1235,7 @@ class Cluster(object):
     zone: str,
     release_channel: ReleaseChannel,
     single_zone: bool,
-  ) -> Optional[HttpRequest]:
+  ) -> Optional[Tuple[HttpRequest, dict]]:
     """generates cluster create request
 
     Args:
@@ -1200,7 +1258,7 @@ class Cluster(object):
                  job response time when a given zone becomes overburdened.
 
     Returns:
-    HttpRequest on success, None otherwise
+    (HttpRequest, request body dict) tuple on success, None otherwise
     """
 
     rz = _parse_zone(zone)
@@ -1238,13 +1296,15 @@ class Cluster(object):
     )
 
     # see https://cloud.google.com/kubernetes-engine/docs/reference/rest/v1/projects.zones.clusters/create
-    return (
+    request = (
       cluster_api.projects()
       .zones()
       .clusters()
       .create(projectId=project_id, zone=zone, body=request_body)
     )
 
+    return request, request_body
+
   # ----------------------------------------------------------------------------
   @staticmethod
   @trap(None, silent=False)
@@ -48,6 +48,9 @@ VALID_JOB_FILE_EXT = (".yaml", ".json")
 DEFAULT_RELEASE_CHANNEL = ReleaseChannel.REGULAR
 CLUSTER_API_VERSION = "v1beta1"
 
+# maximum number of jobs submitted to a cluster at once
+MAX_SUBMIT_WORKERS = 16
+
 # default min_cpu for gpu/tpu -accelerated jobs (in milli-cpu)
 DEFAULT_MIN_CPU_ACCEL = 1500
 # default min_cpu for cpu-only jobs (in milli-cpu)
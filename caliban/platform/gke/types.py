@@ -16,37 +16,35 @@
 """types relevant to gke"""
 
 from enum import Enum
-from typing import NamedTuple, Optional
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 from google.auth.credentials import Credentials
-from kubernetes.client import V1Job
+
+# only used in annotations; kubernetes is slow to import.
+if TYPE_CHECKING:
+  from kubernetes.client import V1Job
+
 
 # ----------------------------------------------------------------------------
 # Node image types
 # see https://cloud.google.com/kubernetes-engine/docs/concepts/node-images
-NodeImage = Enum(
-  "NODE_IMAGE",
-  {
-    "COS": "cos",
-    "UBUNTU": "ubuntu",
-    "COS_CONTAINERD": "cos_containerd",
-    "UBUNTU_CONTAINERD": "ubuntu_containerd",
-  },
-)
+class NodeImage(Enum):
+  COS = "cos"
+  UBUNTU = "ubuntu"
+  COS_CONTAINERD = "cos_containerd"
+  UBUNTU_CONTAINERD = "ubuntu_containerd"
+
 
 # ----------------------------------------------------------------------------
 # GKE operation status, see:
 # https://cloud.google.com/kubernetes-engine/docs/reference/rest/v1/projects.locations.operations
-OpStatus = Enum(
-  "OP_STATUS",
-  {
-    "STATUS_UNSPECIFIED": "STATUS_UNSPECIFIED",
-    "PENDING": "PENDING",
-    "RUNNING": "RUNNING",
-    "DONE": "DONE",
-    "ABORTING": "ABORTING",
-  },
-)
+class OpStatus(Enum):
+  STATUS_UNSPECIFIED = "STATUS_UNSPECIFIED"
+  PENDING = "PENDING"
+  RUNNING = "RUNNING"
+  DONE = "DONE"
+  ABORTING = "ABORTING"
+
 
 # ----------------------------------------------------------------------------
 # Credentials data (credentials, project id)
@@ -55,20 +53,17 @@ CredentialsData = NamedTuple(
   [("credentials", Optional[Credentials]), ("project_id", Optional[str])],
 )
 
+
 # ----------------------------------------------------------------------------
 # GKE release channel, see:
 # https://cloud.google.com/kubernetes-engine/docs/concepts/release-channels
 # https://cloud.google.com/kubernetes-engine/docs/reference/rest/v1beta1/projects.locations.clusters#Cluster.ReleaseChannel
 # https://cloud.google.com/kubernetes-engine/docs/reference/rest/v1beta1/projects.locations.clusters#channel
-ReleaseChannel = Enum(
-  "RELEASE_CHANNEL",
-  {
-    "UNSPECIFIED": "UNSPECIFIED",
-    "RAPID": "RAPID",
-    "REGULAR": "REGULAR",
-    "STABLE": "STABLE",
-  },
-)
+class ReleaseChannel(Enum):
+  UNSPECIFIED = "UNSPECIFIED"
+  RAPID = "RAPID"
+  REGULAR = "REGULAR"
+  STABLE = "STABLE"
 
 
 # ----------------------------------------------------------------------------
@@ -86,7 +81,7 @@ class JobStatus(Enum):
     return self.name in ["FAILED", "SUCCEEDED", "UNAVAILABLE"]
 
   @classmethod
-  def from_job_info(cls, job_info: V1Job) -> "JobStatus":
+  def from_job_info(cls, job_info: "V1Job") -> "JobStatus":
     if job_info is None:
       return JobStatus.STATE_UNSPECIFIED
 
@@ -18,13 +18,14 @@
 from __future__ import absolute_import
 
 import argparse
+import functools
 import json
 import logging
 import os
 import pprint as pp
 import re
 from time import sleep
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from urllib.parse import urlencode, urlparse
 
 import google
@@ -35,12 +36,8 @@ from google.auth._default import (
   _SERVICE_ACCOUNT_TYPE,
   load_credentials_from_file,
 )
-from google.cloud.container_v1 import ClusterManagerClient
-from google.cloud.container_v1.types import Cluster as GKECluster
 from google.oauth2 import service_account
 from googleapiclient import discovery
-from kubernetes.client import V1Job
-from kubernetes.client.api_client import ApiClient
 from yaspin import yaspin
 from yaspin.spinners import Spinners
 
@@ -48,6 +45,14 @@ import caliban.platform.gke.constants as k
 from caliban.platform.cloud.types import GPU, TPU, GPUSpec, TPUSpec
 from caliban.platform.gke.types import CredentialsData, NodeImage, OpStatus
 
+# only used in annotations. kubernetes and the container api client are slow
+# to import, so the functions that need them import them directly.
+if TYPE_CHECKING:
+  from google.cloud.container_v1 import ClusterManagerClient
+  from google.cloud.container_v1.types import Cluster as GKECluster
+  from kubernetes.client import V1Job
+  from kubernetes.client.api_client import ApiClient
+
 
 # ----------------------------------------------------------------------------
 def trap(error_value: Any, silent: bool = True) -> Any:
@@ -112,6 +117,13 @@ def validate_gpu_spec_against_limits(
   return True
 
 
+# ----------------------------------------------------------------------------
+_DAEMONSETS = {
+  NodeImage.COS: k.NVIDIA_DRIVER_COS_DAEMONSET_URL,
+  NodeImage.UBUNTU: k.NVIDIA_DRIVER_UBUNTU_DAEMONSET_URL,
+}
+
+
 # ----------------------------------------------------------------------------
 def nvidia_daemonset_url(node_image: NodeImage) -> Optional[str]:
   """gets nvidia driver daemonset url for given node image
@@ -123,12 +135,7 @@ def nvidia_daemonset_url(node_image: NodeImage) -> Optional[str]:
   daemonset yaml url on success, None otherwise
   """
 
-  DAEMONSETS = {
-    NodeImage.COS: k.NVIDIA_DRIVER_COS_DAEMONSET_URL,
-    NodeImage.UBUNTU: k.NVIDIA_DRIVER_UBUNTU_DAEMONSET_URL,
-  }
-
-  return DAEMONSETS.get(node_image, None)
+  return _DAEMONSETS.get(node_image, None)
 
 
 # ----------------------------------------------------------------------------
@@ -451,9 +458,22 @@ def generate_resource_limits(
   return resource_limits_from_quotas(quotas)
 
 
+# ----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def _api_client() -> "ApiClient":
+  """returns a shared kubernetes ApiClient
+
+  Building a client sets up its own configuration and connection pool, none of
+  which serialization needs, so exporting many jobs shares a single instance.
+  """
+  from kubernetes.client.api_client import ApiClient
+
+  return ApiClient()
+
+
 # ----------------------------------------------------------------------------
 @trap(None, silent=False)
-def job_to_dict(job: V1Job) -> Optional[dict]:
+def job_to_dict(job: "V1Job") -> Optional[dict]:
   """convert V1Job to dictionary
 
   Note that this is *different* than what is returned by V1Job.to_dict().
@@ -467,7 +487,7 @@ def job_to_dict(job: V1Job) -> Optional[dict]:
   dictionary representation on success, None otherwise
   """
 
-  return ApiClient().sanitize_for_serialization(job)
+  return _api_client().sanitize_for_serialization(job)
 
 
 # ----------------------------------------------------------------------------
@@ -530,7 +550,7 @@ def nonnull_dict(d: dict) -> dict:
 
 
 # ----------------------------------------------------------------------------
-def job_str(job: V1Job) -> str:
+def job_str(job: "V1Job") -> str:
   """formats job string to remove all default (None) values
 
   Args:
@@ -568,7 +588,7 @@ def validate_job_filename(s: str) -> str:
 
 # ----------------------------------------------------------------------------
 @trap(False, silent=False)
-def export_job(job: V1Job, filename: str) -> bool:
+def export_job(job: "V1Job", filename: str) -> bool:
   """exports job as a kubernetes job spec to file
 
   The output format is determined from the file extension.
@@ -600,6 +620,12 @@ def export_job(job: V1Job, filename: str) -> bool:
 
 
 # ----------------------------------------------------------------------------
+_ALNUM_RE = re.compile("[a-z0-9]")
+_INVALID_JOB_NAME_RE = re.compile(r"[^a-z0-9\-.]")
+
+
+# ----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
 def sanitize_job_name(name: str) -> str:
   """sanitizes job name to fit DNS-1123 restrictions:
 
@@ -629,11 +655,8 @@ def sanitize_job_name(name: str) -> str:
   def _valid(name):
     return k.DNS_1123_RE.match(name) is not None
 
-  alnum_re = re.compile("[a-z0-9]")
-  invalid_re = re.compile("[^a-z0-9\-\.]")
-
   def _alnum(x):
-    return alnum_re.match(x) is not None
+    return _ALNUM_RE.match(x) is not None
 
   # already valid, so done
   if _valid(name):
@@ -648,7 +671,12 @@ def sanitize_job_name(name: str) -> str:
     name = name + "-0"
 
   # replace all invalid chars with '-'
-  return invalid_re.sub("-", name)
+  return _INVALID_JOB_NAME_RE.sub("-", name)
+
+
+# credentials loaded by credentials(), keyed by credentials file (None for the
+# system defaults)
+_CREDENTIALS: Dict[Optional[str], CredentialsData] = {}
 
 
 # ----------------------------------------------------------------------------
@@ -720,6 +748,10 @@ def credentials_from_file(
 def credentials(creds_file: Optional[str] = None) -> CredentialsData:
   """get credentials data, either from provided file or from system defaults
 
+  Loading credentials refreshes them, which is a network round-trip, so
+  credentials are loaded once per process for each creds_file and reused until
+  they expire. Failed loads are not cached.
+
   Args:
   creds_file: (optional) path to credentials file
 
@@ -727,17 +759,26 @@ def credentials(creds_file: Optional[str] = None) -> CredentialsData:
   CredentialsData
   """
 
+  cached = _CREDENTIALS.get(creds_file)
+  if cached is not None and not cached.credentials.expired:
+    return cached
+
   if creds_file is None:
-    return default_credentials()
+    creds_data = default_credentials()
+  else:
+    creds_data = credentials_from_file(creds_file)
+
+  if creds_data.credentials is not None:
+    _CREDENTIALS[creds_file] = creds_data
 
-  return credentials_from_file(creds_file)
+  return creds_data
 
 
 # --------------------------------------------------------------------------
 @trap(None)
 def get_gke_clusters(
-  client: ClusterManagerClient, project_id: str, zone: str = "-"
-) -> Optional[List[GKECluster]]:
+  client: "ClusterManagerClient", project_id: str, zone: str = "-"
+) -> Optional[List["GKECluster"]]:
   """gets list of gcp clusters for given project, zone
 
   Args:
@@ -755,8 +796,8 @@ def get_gke_clusters(
 # ----------------------------------------------------------------------------
 @trap(None)
 def get_gke_cluster(
-  client: ClusterManagerClient, name: str, project_id: str, zone: str = "-"
-) -> Optional[GKECluster]:
+  client: "ClusterManagerClient", name: str, project_id: str, zone: str = "-"
+) -> Optional["GKECluster"]:
   """gets specific cluster instance by name
 
   Args:
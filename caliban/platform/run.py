@@ -23,7 +23,8 @@ from __future__ import absolute_import, division, print_function
 import subprocess
 import sys
 import traceback
-from typing import Any, Dict, Iterable, List, Optional
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Sized
 
 import tqdm
 from absl import logging
@@ -60,13 +61,14 @@ def _run_cmd(job_mode: c.JobMode, run_args: Optional[List[str]] = None) -> List[
   if run_args is None:
     run_args = []
 
-  runtime = ["--runtime", "nvidia"] if c.gpu(job_mode) else []
-  return (
-    ["docker", "run", "--platform", "linux/amd64"]
-    + runtime
-    + ["--ipc", "host"]
-    + run_args
-  )
+  ret = ["docker", "run", "--platform", "linux/amd64"]
+
+  if c.gpu(job_mode):
+    ret.extend(["--runtime", "nvidia"])
+
+  ret.extend(["--ipc", "host"])
+  ret.extend(run_args)
+  return ret
 
 
 def log_job_spec_instance(job_spec: JobSpec, i: int) -> JobSpec:
@@ -157,7 +159,9 @@ def _create_job_spec_dict(
   # emitted in the proper order from inside the container.
   terminal_cmds = ["-e", "PYTHONUNBUFFERED=1"] + window_size_env_cmds()
 
-  base_cmd = _run_cmd(job_mode, run_args) + terminal_cmds + [image_id]
+  command = _run_cmd(job_mode, run_args)
+  command.extend(terminal_cmds)
+  command.append(image_id)
 
   launcher_args = um.mlflow_args(
     caliban_config=caliban_config,
@@ -174,49 +178,109 @@ def _create_job_spec_dict(
   cmd_args = ce.experiment_to_args(experiment.kwargs, experiment.args)
 
   # cmd args *must* be last in order for the launcher to pass them through
-  command = base_cmd + launcher_args + cmd_args
+  command.extend(launcher_args)
+  command.extend(cmd_args)
 
   return {"command": command, "container": image_id}
 
 
 # ----------------------------------------------------------------------------
+def _execute_command(
+  command: List[str], dry_run: bool = False, line_prefix: str = ""
+) -> int:
+  """Runs the supplied `docker run` command, streaming its output through tqdm
+  with line_prefix before each line, and returns the command's return code. Dry
+  runs always return 0.
+
+  """
+  if dry_run:
+    return 0
+
+  return ufs.stream_stdout(command, "", ut.TqdmFile(sys.stderr, line_prefix))
+
+
 def execute_jobs(
   job_specs: Iterable[JobSpec],
   dry_run: bool = False,
   caliban_config: Optional[Dict[str, Any]] = None,
+  parallelism: int = 1,
+  num_specs: Optional[int] = None,
 ):
   """executes a sequence of jobs based on job specs
 
   Arg:
-  job_specs: specifications for jobs to be executed
+  job_specs: specifications for jobs to be executed. These are consumed lazily,
+    so a generator lets the first job start before the rest exist.
   dry_run: if True, only print what would be done
   caliban_config: caliban configuration data
+  parallelism: maximum number of jobs to execute at once. Job results are
+    still recorded in the order the jobs were supplied.
+  num_specs: used for progress bar if supplied. Defaults to the length of
+    job_specs, if it has one.
   """
   caliban_config = caliban_config or {}
 
-  with ut.tqdm_logging() as orig_stream:
-    pbar = tqdm.tqdm(
-      logged_job_specs(job_specs),
-      file=orig_stream,
-      total=len(job_specs),
-      ascii=True,
-      unit="experiment",
-      desc="Executing",
-    )
-    for idx, job_spec in enumerate(pbar, 1):
-      command = job_spec.spec["command"]
-      logging.info(f'Running command: {" ".join(command)}')
-      if not dry_run:
-        _, ret_code = ufs.capture_stdout(command, "", ut.TqdmFile(sys.stderr))
-      else:
-        ret_code = 0
+  if num_specs is None and isinstance(job_specs, Sized):
+    num_specs = len(job_specs)
+
+  # job specs by index, for jobs that haven't been recorded yet; and the return
+  # code of each of those jobs that has finished. Jobs can finish in any order,
+  # but are recorded in the order they were supplied.
+  specs = {}
+  ret_codes = {}
+  next_idx = 1
+
+  # index of each job that's still running, by its future.
+  running = {}
+
+  def record_finished():
+    nonlocal next_idx
+    while next_idx in ret_codes:
+      job_spec = specs.pop(next_idx)
+      ret_code = ret_codes.pop(next_idx)
       j = Job(
         spec=job_spec,
         container=job_spec.spec["container"],
         details={"ret_code": ret_code},
         status=JobStatus.SUCCEEDED if ret_code == 0 else JobStatus.FAILED,
       )
-      local_callback(idx=idx, job=j)
+      local_callback(idx=next_idx, job=j)
+      next_idx += 1
+
+  def collect(pbar, return_when):
+    done, _ = wait(running, return_when=return_when)
+    for future in done:
+      ret_codes[running.pop(future)] = future.result()
+      pbar.update()
+    record_finished()
+
+  with ut.tqdm_logging() as orig_stream:
+    with tqdm.tqdm(
+      file=orig_stream,
+      total=num_specs,
+      ascii=True,
+      unit="experiment",
+      desc="Executing",
+    ) as pbar:
+      # Only the docker processes run on the pool's threads; Job records are
+      # created here, on the thread that owns the database session.
+      with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        for idx, job_spec in enumerate(logged_job_specs(job_specs), 1):
+          command = job_spec.spec["command"]
+          logging.info(f'Running command: {" ".join(command)}')
+          specs[idx] = job_spec
+
+          # with several jobs writing to the terminal at once, each line of
+          # output is tagged with the job it came from.
+          line_prefix = f"[{idx}] " if parallelism > 1 else ""
+          future = executor.submit(_execute_command, command, dry_run, line_prefix)
+          running[future] = idx
+
+          # a new job starts as soon as any slot frees up.
+          if len(running) >= parallelism:
+            collect(pbar, FIRST_COMPLETED)
+
+        collect(pbar, ALL_COMPLETED)
 
   if dry_run:
     logging.info(
@@ -237,6 +301,7 @@ def run_experiments(
   dry_run: bool = False,
   experiment_config: Optional[ce.ExpConf] = None,
   xgroup: Optional[str] = None,
+  parallelism: int = 1,
   **build_image_kwargs,
 ) -> None:
   """Builds an image using the supplied **build_image_kwargs and calls `docker
@@ -258,6 +323,7 @@ def run_experiments(
   - dry_run: if True, no actual jobs will be executed and docker won't
     actually build; logging side effects will show the user what will happen
     without dry_run=True.
+  - parallelism: maximum number of experiments to run at once.
 
   any extra kwargs supplied are passed through to build_image.
   """
@@ -294,7 +360,7 @@ def run_experiments(
       xgroup=xgroup,
     )
 
-    job_specs = [
+    job_specs = (
       JobSpec.get_or_create(
         experiment=x,
         spec=_create_job_spec_dict(
@@ -308,10 +374,16 @@ def run_experiments(
         platform=Platform.LOCAL,
       )
       for i, x in enumerate(experiments)
-    ]
+    )
 
     try:
-      execute_jobs(job_specs=job_specs, dry_run=dry_run, caliban_config=caliban_config)
+      execute_jobs(
+        job_specs=job_specs,
+        dry_run=dry_run,
+        caliban_config=caliban_config,
+        parallelism=parallelism,
+        num_specs=len(experiments),
+      )
     except Exception as e:
       logging.error(f"exception: {e}")
       logging.error(f"{traceback.format_exc()}")
@@ -345,9 +417,9 @@ def run(
   if image_id is None:
     image_id = b.build_image(job_mode, **build_image_kwargs)
 
-  base_cmd = _run_cmd(job_mode, run_args)
-
-  command = base_cmd + [image_id] + script_args
+  command = _run_cmd(job_mode, run_args)
+  command.append(image_id)
+  command.extend(script_args)
 
   logging.info("Running command: {}".format(" ".join(command)))
   subprocess.call(command)
@@ -19,12 +19,12 @@ and notebooks in a Docker environment.
 """
 
 import os
-from pathlib import Path
 from typing import List, Optional
 
 import caliban.config as c
 import caliban.docker.build as b
 import caliban.platform.run as r
+import caliban.util as u
 
 
 def _home_mount_cmds(enable_home_mount: bool) -> List[str]:
@@ -36,7 +36,7 @@ def _home_mount_cmds(enable_home_mount: bool) -> List[str]:
   """
   ret = []
   if enable_home_mount:
-    ret = ["-v", "{}:{}".format(Path.home(), b.container_home())]
+    ret = ["-v", f"{u.home_dir()}:{b.container_home()}"]
   return ret
 
 
@@ -46,9 +46,9 @@ def _interactive_opts(workdir: str) -> List[str]:
     "-w",
     workdir,
     "-u",
-    "{}:{}".format(os.getuid(), os.getgid()),
+    b.container_user(),
     "-v",
-    "{}:{}".format(os.getcwd(), workdir),
+    f"{os.getcwd()}:{workdir}",
   ]
 
 
@@ -102,12 +102,10 @@ def run_interactive(
   if entrypoint is None:
     entrypoint = b.SHELL_DICT[shell].executable
 
-  interactive_run_args = (
-    _interactive_opts(workdir)
-    + ["-it", "--entrypoint", entrypoint]
-    + _home_mount_cmds(mount_home)
-    + run_args
-  )
+  interactive_run_args = _interactive_opts(workdir)
+  interactive_run_args.extend(["-it", "--entrypoint", entrypoint])
+  interactive_run_args.extend(_home_mount_cmds(mount_home))
+  interactive_run_args.extend(run_args)
 
   r.run(
     job_mode=job_mode,
@@ -16,12 +16,14 @@
 """
 Utilities for our job runner.
 """
+import functools
 import getpass
 import itertools as it
 import os
 import platform
 import sys
 from enum import Enum
+from pathlib import Path
 from typing import (
   Any,
   Callable,
@@ -56,10 +58,25 @@ def err(s: str) -> None:
   sys.stderr.write(t.red(s))
 
 
+@functools.lru_cache(maxsize=None)
 def current_user() -> str:
+  """Returns the name of the user running caliban. This can't change while the
+  process is running, so the (potentially /etc/passwd-reading) lookup only
+  happens once.
+
+  """
   return getpass.getuser()
 
 
+@functools.lru_cache(maxsize=None)
+def home_dir() -> str:
+  """Returns the home directory of the user running caliban, looked up once per
+  process.
+
+  """
+  return str(Path.home())
+
+
 def is_mac() -> bool:
   """Returns True if the current code is executing on a Mac, False otherwise."""
   return platform.system() == "Darwin"
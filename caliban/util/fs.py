@@ -22,7 +22,6 @@ import shutil
 import socket
 import subprocess
 import sys
-import time
 import uuid
 from itertools import chain
 from typing import Dict, List, NamedTuple, Optional, Tuple
@@ -113,6 +112,18 @@ def generate_package(
   return Package(executable, root, path, main_module)
 
 
+def _link_or_copy(src: str, dst: str) -> None:
+  """Hard links src to dst, so that no bytes are copied. Falls back to a copy
+  if a link isn't possible (a different filesystem, say, or an existing file at
+  dst).
+
+  """
+  try:
+    os.link(src, dst)
+  except OSError:
+    shutil.copy2(src, dst)
+
+
 class TempCopy(object):
   """TempCopy is a class that you can use as a context manager to transfer files
   into the local directory with either
@@ -123,7 +134,8 @@ class TempCopy(object):
   Supply a dictionary mapping your files => your requested filename (or None).
   When used as a context manager, TempCopy will
 
-  - copy data from every source to every destination
+  - copy data from every source to every destination (as a hard link, where
+    possible)
   - return a dictionary of the source you provided => the destination's path in
     the local directory.
 
@@ -213,7 +225,7 @@ class TempCopy(object):
     to_write = self._expand(current_dir, mapping)
 
     for src, dst in to_write.items():
-      shutil.copy2(src, dst)
+      _link_or_copy(src, dst)
 
     self._written = to_write
 
@@ -231,10 +243,33 @@ class TempCopy(object):
       self._written = None
 
 
-def capture_stdout(cmd: List[str], input_str: Optional[str] = None, file=None) -> str:
-  """Executes the supplied command with the supplied string of std input, then
-  streams the output to stdout, and returns it as a string along with the
-  process's return code.
+class _Tee(object):
+  """Minimal file-like object that writes everything it receives to each of the
+  supplied streams.
+
+  """
+
+  def __init__(self, *streams):
+    self._streams = streams
+
+  def write(self, s: str) -> None:
+    for stream in self._streams:
+      stream.write(s)
+
+  def flush(self) -> None:
+    for stream in self._streams:
+      stream.flush()
+
+
+def stream_stdout(
+  cmd: List[str],
+  input_str: Optional[str] = None,
+  file=None,
+  env: Optional[Dict[str, str]] = None,
+) -> int:
+  """Executes the supplied command with the supplied string of std input and
+  streams the output to stdout, line by line, as it arrives. None of the output
+  is retained, so memory use doesn't grow with the length of the output.
 
   Args:
   cmd: list of strings to send in as the command
@@ -242,17 +277,16 @@ def capture_stdout(cmd: List[str], input_str: Optional[str] = None, file=None) -
              command. if None, stdin will get closed immediately.
   file: optional file-like object (stream): the output from the executed
         process's stdout will get sent to this stream. Defaults to sys.stdout.
+  env: optional environment for the process. Defaults to the current
+       process's environment.
 
   Returns:
-  Pair of
-  - string of all stdout received during the command's execution
-  - return code of the process
+  the return code of the process.
 
   """
   if file is None:
     file = sys.stdout
 
-  buf = io.StringIO()
   ret_code = None
 
   with subprocess.Popen(
@@ -261,6 +295,7 @@ def capture_stdout(cmd: List[str], input_str: Optional[str] = None, file=None) -
     stdout=subprocess.PIPE,
     stderr=subprocess.STDOUT,
     universal_newlines=False,
+    env=env,
   ) as p:
     if input_str:
       p.stdin.write(input_str.encode("utf-8"))
@@ -269,20 +304,50 @@ def capture_stdout(cmd: List[str], input_str: Optional[str] = None, file=None) -
     out = io.TextIOWrapper(p.stdout, newline="")
 
     for line in out:
-      buf.write(line)
       file.write(line)
       file.flush()
 
     # flush to force the contents to display.
     file.flush()
 
-    while p.poll() is None:
-      # Process hasn't exited yet, let's wait some
-      time.sleep(0.5)
-
-    ret_code = p.returncode
+    # stdout has closed, so the process is exiting; block until it has.
+    ret_code = p.wait()
     p.stdout.close()
 
+  return ret_code
+
+
+def capture_stdout(
+  cmd: List[str],
+  input_str: Optional[str] = None,
+  file=None,
+  env: Optional[Dict[str, str]] = None,
+) -> str:
+  """Executes the supplied command with the supplied string of std input, then
+  streams the output to stdout, and returns it as a string along with the
+  process's return code.
+
+  Args:
+  cmd: list of strings to send in as the command
+  input_str: if supplied, this string will be passed as stdin to the supplied
+             command. if None, stdin will get closed immediately.
+  file: optional file-like object (stream): the output from the executed
+        process's stdout will get sent to this stream. Defaults to sys.stdout.
+  env: optional environment for the process. Defaults to the current
+       process's environment.
+
+  Returns:
+  Pair of
+  - string of all stdout received during the command's execution
+  - return code of the process
+
+  """
+  if file is None:
+    file = sys.stdout
+
+  buf = io.StringIO()
+  ret_code = stream_stdout(cmd, input_str=input_str, file=_Tee(buf, file), env=env)
+
   return buf.getvalue(), ret_code
 
 
@@ -84,6 +84,12 @@ File = s.Schema(
   error="""File '{}' isn't a valid file on your system. Try again!""",
 )
 
+PositiveInt = s.And(
+  s.Use(int),
+  lambda n: n > 0,
+  error="""'{}' isn't a positive integer.""",
+)
+
 Json = s.And(
   File,
   s.Use(
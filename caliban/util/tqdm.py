@@ -30,16 +30,22 @@ t = Terminal()
 
 
 class TqdmFile(object):
-  """Dummy file-like that will write to tqdm"""
+  """Dummy file-like that will write to tqdm. If supplied, line_prefix is
+  written before each non-empty line, so that output from several processes
+  sharing the terminal can be told apart."""
 
   file = None
   prefix = _term_move_up() + "\r"
 
-  def __init__(self, file):
+  def __init__(self, file, line_prefix: str = ""):
     self.file = file
+    self.line_prefix = line_prefix
     self._carriage_pending = False
 
   def write(self, line):
+    if line:
+      line = self.line_prefix + line
+
     if self._carriage_pending:
       line = self.prefix + line
       self._carriage_pending = False
@@ -42,7 +42,7 @@ REQUIRED_PACKAGES = [
   "absl-py",
   "blessings",
   "commentjson==0.8.3",
-  "google-api-python-client",
+  "google-api-python-client>=2.0.0",
   "pyyaml",
   "tqdm>=4.45.0",
   "kubernetes>=10.0.1",
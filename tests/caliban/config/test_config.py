@@ -157,6 +157,15 @@ def test_base_image():
   assert c.base_image(conf, c.JobMode.GPU) == "random:latest"
 
 
+def test_build_time_credentials():
+  """Credentials are only needed at build time if the user asks for them."""
+  assert not c.build_time_credentials({})
+  assert not c.build_time_credentials(c.CalibanConfig.validate({}))
+
+  conf = c.CalibanConfig.validate({"build_time_credentials": True})
+  assert c.build_time_credentials(conf)
+
+
 def test_caliban_config(tmpdir):
   """Tests validation of the CalibanConfig schema and the method that returns the
   parsed config.
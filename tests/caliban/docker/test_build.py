@@ -14,7 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
+import caliban.config as c
 import caliban.docker.build as b
+import caliban.util.fs as ufs
+import pytest
 
 
 def test_shell_dict():
@@ -52,3 +57,260 @@ COPY --chown=1:1 face cake
 COPY --chown=1:1 face cake.py
 """
   )
+
+
+def test_dockerfile_layer_order():
+  """Dependencies install, and caliban's resources are copied in, before
+  credentials, extra directories and code, unless the user needs credentials at
+  build time."""
+
+  def positions(**kwargs):
+    dockerfile = b._dockerfile_template(
+      c.JobMode.CPU,
+      package=[["python", "-m"], "trainer", "trainer/train.py", "trainer.train"],
+      requirements_path="requirements.txt",
+      credentials_path=".caliban_default_creds.json",
+      extra_dirs=["data"],
+      resource_files=["caliban_launcher.py"],
+      **kwargs,
+    )
+    return (
+      dockerfile.index("pip install"),
+      dockerfile.index("caliban_launcher.py"),
+      dockerfile.index(".caliban_default_creds.json"),
+      dockerfile.index("COPY --chown={}:{} data".format(os.getuid(), os.getgid())),
+      dockerfile.index("COPY --chown={}:{} trainer".format(os.getuid(), os.getgid())),
+    )
+
+  pip, resources, creds, data, code = positions()
+  assert pip < resources < creds < data < code
+
+  pip, resources, creds, data, code = positions(
+    caliban_config={"build_time_credentials": True}
+  )
+  assert creds < pip < resources < data < code
+
+
+def test_dockerfile_whitespace():
+  """Generated Dockerfiles have no trailing whitespace or runs of blank
+  lines."""
+  dockerfile = b._dockerfile_template(
+    c.JobMode.CPU,
+    package=[["python", "-m"], "trainer", "trainer/train.py", "trainer.train"],
+    requirements_path="requirements.txt",
+    extra_dirs=["data", "logs"],
+    resource_files=["caliban_launcher.py"],
+    caliban_config={"mlflow_config": {}},
+  )
+
+  assert "\n\n\n" not in dockerfile
+  assert all(line == line.rstrip() for line in dockerfile.splitlines())
+
+
+def test_dependency_entries_order():
+  """setup.py installs after the more stable requirements.txt and conda
+  environment files."""
+  entries = b._dependency_entries(
+    "/usr/app",
+    1,
+    1,
+    requirements_path="requirements.txt",
+    conda_env_path="environment.yml",
+    setup_extras=[],
+  )
+
+  conda = entries.index("environment.yml")
+  reqs = entries.index("requirements.txt")
+  setup = entries.index("setup.py")
+  assert conda < reqs < setup
+
+
+def test_extra_dir_entries():
+  """Each directory is copied exactly once, in the order supplied."""
+  entries = b._extra_dir_entries("/usr/app", 1, 1, ["data/", "./data", "logs"])
+
+  assert entries.count("COPY") == 2
+  assert entries.index("data /usr/app/data") < entries.index("logs /usr/app/logs")
+
+
+def test_pull_cache_images(fake_process):
+  """Images that can't be pulled don't stop the build."""
+  fake_process.register_subprocess(["docker", "pull", "gcr.io/face/cake"])
+  fake_process.register_subprocess(
+    ["docker", "pull", "gcr.io/face/missing"], returncode=1
+  )
+
+  b._pull_cache_images(["gcr.io/face/cake", "gcr.io/face/missing"])
+
+  assert fake_process.call_count(["docker", "pull", "gcr.io/face/cake"]) == 1
+  assert fake_process.call_count(["docker", "pull", "gcr.io/face/missing"]) == 1
+
+
+def test_buildkit_enabled(monkeypatch):
+  """BuildKit is on by default when buildx is installed, but users can switch
+  it off."""
+  monkeypatch.delenv("DOCKER_BUILDKIT", raising=False)
+  monkeypatch.setattr(b, "_buildx_available", lambda: True)
+  assert b._buildkit_enabled(b._build_env())
+
+  monkeypatch.setenv("DOCKER_BUILDKIT", "0")
+  assert not b._buildkit_enabled(b._build_env())
+
+
+def test_buildkit_without_buildx(monkeypatch):
+  """Without buildx, the environment is left alone and the legacy builder's
+  features are used."""
+  monkeypatch.delenv("DOCKER_BUILDKIT", raising=False)
+  monkeypatch.setattr(b, "_buildx_available", lambda: False)
+
+  env = b._build_env()
+  assert "DOCKER_BUILDKIT" not in env
+  assert not b._buildkit_enabled(env)
+
+
+def test_buildx_available(fake_process):
+  fake_process.register_subprocess(["docker", "buildx", "version"], returncode=1)
+
+  b._buildx_available.cache_clear()
+  assert not b._buildx_available()
+  b._buildx_available.cache_clear()
+
+
+def test_tf_base_image():
+  assert (
+    b.tf_base_image(c.JobMode.GPU, "2.2.0") == "tensorflow/tensorflow:2.2.0-gpu-py3"
+  )
+  assert b.tf_base_image(c.JobMode.CPU, "1.15.0") == "tensorflow/tensorflow:1.15.0-py3"
+
+  with pytest.raises(Exception):
+    b.tf_base_image(c.JobMode.CPU, "0.0.1")
+
+
+def test_package_entries_order():
+  """The code COPY is the final instruction, so it's the only layer a code edit
+  invalidates."""
+  package = ufs.Package(
+    ["python", "-m"], "trainer", "trainer/train.py", "trainer.train"
+  )
+  entries = b._package_entries("/usr/app", 1, 1, package)
+
+  assert entries.index("ENTRYPOINT") < entries.index("COPY --chown=1:1 trainer")
+
+
+def test_dockerignore_entries():
+  """Only the paths the Dockerfile copies are sent to the Docker daemon."""
+  dockerfile = b._dockerfile_template(
+    c.JobMode.CPU,
+    package=[["python", "-m"], "trainer", "trainer/train.py", "trainer.train"],
+    requirements_path="requirements.txt",
+    setup_extras=[],
+    extra_dirs=["data"],
+    resource_files=["launcher.py"],
+  )
+  assert b._dockerignore_entries(dockerfile) == [
+    "*",
+    "!requirements.txt",
+    "!setup.py",
+    "!launcher.py",
+    "!data",
+    "!trainer",
+    "**/__pycache__",
+    "**/*.pyc",
+  ]
+
+  # Scripts in the root directory need the whole build path.
+  dockerfile = b._dockerfile_template(
+    c.JobMode.CPU, package=[["python"], ".", "train.py", None]
+  )
+  assert b._dockerignore_entries(dockerfile) == b.DEFAULT_DOCKERIGNORE
+
+
+def test_default_dockerignore(tmpdir):
+  """A default .dockerignore only exists for the duration of the build, and
+  never replaces the user's own."""
+  path = tmpdir.join(".dockerignore")
+
+  with b._default_dockerignore(str(tmpdir), ["*", "!trainer"]):
+    assert path.read().splitlines() == [b._DOCKERIGNORE_MARKER, "*", "!trainer"]
+  assert not path.exists()
+
+  path.write("data\n")
+  with b._default_dockerignore(str(tmpdir), ["*", "!trainer"]):
+    assert path.read() == "data\n"
+  assert path.read() == "data\n"
+
+
+def test_default_dockerignore_stale(tmpdir):
+  """A .dockerignore left behind by an interrupted build is replaced, then
+  removed."""
+  path = tmpdir.join(".dockerignore")
+  path.write(f"{b._DOCKERIGNORE_MARKER}\n*\n!trainer\n")
+
+  with b._default_dockerignore(str(tmpdir), ["*", "!trainer", "!data"]):
+    assert path.read().splitlines() == [
+      b._DOCKERIGNORE_MARKER,
+      "*",
+      "!trainer",
+      "!data",
+    ]
+  assert not path.exists()
+
+
+def test_notebook_entries():
+  assert b._notebook_entries(lab=True, version="2.1.0").strip() == (
+    f"RUN {b.PIP_INSTALL} jupyterlab==2.1.0"
+  )
+
+
+def test_container_user():
+  assert b.container_user() == f"{os.getuid()}:{os.getgid()}"
+
+
+def test_pip_install_entry():
+  """pip's cache only ever lives in a BuildKit cache mount."""
+  assert (
+    b._pip_install_entry(1, 1, "-r requirements.txt")
+    == f'RUN /bin/bash -c "{b.PIP_INSTALL} -r requirements.txt"'
+  )
+
+  cached = b._pip_install_entry(1, 1, ".[cpu]", cache_dir="/tmp/pip")
+  assert cached == (
+    "RUN --mount=type=cache,target=/tmp/pip,uid=1,gid=1 "
+    f'/bin/bash -c "{b.PIP_CACHED_INSTALL} --cache-dir=/tmp/pip .[cpu]"'
+  )
+
+
+def test_custom_packages():
+  """Under BuildKit, aptitude's caches live in cache mounts rather than getting
+  cleaned out of the image."""
+  plain = b._custom_packages(1, 1, packages=["git"])
+  assert "apt-get clean" in plain
+  assert "--mount" not in plain
+
+  cached = b._custom_packages(1, 1, packages=["git"], cache_apt=True)
+  assert f"RUN {b.APT_CACHE_MOUNTS} rm -f /etc/apt/apt.conf.d/docker-clean" in cached
+  assert "apt-get clean" not in cached
+  assert "git" in cached
+
+  # Duplicates and ordering don't change the generated entry.
+  assert b._custom_packages(1, 1, packages=["vim", "git", "vim"]) == (
+    b._custom_packages(1, 1, packages=["git", "vim"])
+  )
+
+
+def test_default_shell(monkeypatch):
+  """bash is the default, even if SHELL isn't set."""
+  for shell, expected in [
+    (None, b.Shell.bash),
+    ("/bin/bash", b.Shell.bash),
+    ("/usr/bin/zsh", b.Shell.zsh),
+  ]:
+    if shell is None:
+      monkeypatch.delenv("SHELL", raising=False)
+    else:
+      monkeypatch.setenv("SHELL", shell)
+
+    b.default_shell.cache_clear()
+    assert b.default_shell() == expected
+
+  b.default_shell.cache_clear()
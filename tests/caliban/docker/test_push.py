@@ -15,6 +15,16 @@
 # limitations under the License.
 
 import caliban.docker.push as p
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_pushed():
+  """Images known to be pushed are remembered per process; forget them between
+  tests."""
+  p._PUSHED.clear()
+  yield
+  p._PUSHED.clear()
 
 
 def register_list_tags(process, project_id, tag, **kwargs):
@@ -26,6 +36,7 @@ def register_list_tags(process, project_id, tag, **kwargs):
       "list-tags",
       f"--project={project_id}",
       "--format=json",
+      "--limit=1",
       tag,
     ],
     **kwargs,
@@ -89,3 +100,40 @@ def test_push_uuid_tag_if_no_remote_image(fake_process):
   fake_process.register_subprocess(["docker", "push", tag])
 
   assert p.push_uuid_tag(project_id, image_id) == tag
+
+
+def test_push_uuid_tag_async(fake_process):
+  """The tag is available immediately; the future resolves to it once the push
+  completes."""
+  project_id = "project"
+  image_id = "imageid"
+
+  tag = p._image_tag_for_project(project_id, image_id)
+
+  fake_process.register_subprocess(["docker", "tag", image_id, tag])
+  fake_process.register_subprocess(["docker", "push", tag])
+
+  image_tag, push = p.push_uuid_tag_async(project_id, image_id, force=True)
+  assert image_tag == tag
+  assert push.result() == tag
+  assert fake_process.call_count(["docker", "push", tag]) == 1
+
+
+def test_gcr_image_pushed_remembers_pushes(fake_process):
+  """Once an image is known to exist remotely, gcloud isn't asked again."""
+  project_id = "project"
+  image_id = "imageid"
+
+  base_tag = p._image_tag_for_project(project_id, image_id, include_tag=False)
+  register_list_tags(fake_process, project_id, base_tag, stdout="[]")
+  register_list_tags(fake_process, project_id, base_tag, stdout='[{"metadata": []}]')
+
+  assert not p.gcr_image_pushed(project_id, image_id)
+  assert p.gcr_image_pushed(project_id, image_id)
+  assert p.gcr_image_pushed(project_id, image_id)
+  assert (
+    fake_process.call_count(
+      ["gcloud", "container", "images", "list-tags", fake_process.any()]
+    )
+    == 2
+  )
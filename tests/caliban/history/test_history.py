@@ -17,6 +17,7 @@
 
 from datetime import datetime
 
+from kubernetes.client import V1Job, V1JobStatus, V1ObjectMeta
 from sqlalchemy.engine.base import Engine
 
 import pytest  # type: ignore
@@ -26,9 +27,11 @@ from caliban.history.types import (
   ExperimentGroup,
   Job,
   JobSpec,
+  JobStatus,
   Platform,
 )
-from caliban.history.util import get_mem_engine, session_scope
+import caliban.history.util as hu
+from caliban.history.util import get_mem_engine, session_scope, update_job_statuses
 from caliban.util import current_user
 
 # https://mypy.readthedocs.io/en/latest/jobning_mypy.html#missing-imports
@@ -273,3 +276,139 @@ def test_job(engine: Engine):
     assert j.experiment.kwargs == kwargs
     assert j.spec.spec == job_spec
     assert j.details["job_id"] == 123
+
+
+# ----------------------------------------------------------------------------
+def test_update_job_statuses(monkeypatch):
+  """gke job statuses are read with a single job listing per cluster"""
+  e = Experiment.get_or_create(
+    xgroup=ExperimentGroup(), container_spec=ContainerSpec(spec={})
+  )
+
+  def gke_job(cluster_name: str, name: str, status=JobStatus.SUBMITTED) -> Job:
+    spec = JobSpec.get_or_create(
+      experiment=e, spec={"name": name}, platform=Platform.GKE
+    )
+    details = {
+      "project_id": "project",
+      "cluster_zone": "us-central1-a",
+      "cluster_name": cluster_name,
+      "job": {"metadata": {"name": name}},
+    }
+    return Job(spec=spec, container="container", details=details, status=status)
+
+  listings = []
+
+  class FakeCluster:
+    def jobs(self, namespace=None, field_selector=None):
+      listings.append((namespace, field_selector))
+      return [
+        V1Job(metadata=V1ObjectMeta(name="a"), status=V1JobStatus(active=1)),
+        V1Job(
+          metadata=V1ObjectMeta(name="b"),
+          status=V1JobStatus(completion_time=datetime.now(), succeeded=1),
+        ),
+      ]
+
+  lookups = []
+
+  def get_job_cluster(j):
+    lookups.append(j.details["cluster_name"])
+    return FakeCluster()
+
+  monkeypatch.setattr("caliban.history.util.get_job_cluster", get_job_cluster)
+
+  jobs = [
+    gke_job("c0", "a"),
+    gke_job("c1", "b"),
+    gke_job("c0", "b"),
+    gke_job("c0", "missing"),
+    gke_job("c1", "a", status=JobStatus.FAILED),
+  ]
+  update_job_statuses(jobs)
+
+  assert sorted(lookups) == ["c0", "c1"]
+
+  # listings are scoped to the jobs' namespace, and to the job itself when it's
+  # the only one to update on its cluster.
+  assert sorted(listings, key=str) == [
+    ("default", "metadata.name=b"),
+    ("default", None),
+  ]
+  assert [j.status for j in jobs] == [
+    JobStatus.RUNNING,
+    JobStatus.SUCCEEDED,
+    JobStatus.SUCCEEDED,
+    JobStatus.UNKNOWN,
+    JobStatus.FAILED,
+  ]
+
+
+def test_update_caip_job_statuses(monkeypatch):
+  """caip job statuses are fetched in batches of at most _CAIP_MAX_BATCH_SIZE
+  requests, and a job whose request fails is marked UNKNOWN"""
+  e = Experiment.get_or_create(
+    xgroup=ExperimentGroup(), container_spec=ContainerSpec(spec={})
+  )
+
+  def caip_job(job_id: str) -> Job:
+    spec = JobSpec.get_or_create(
+      experiment=e, spec={"jobId": job_id}, platform=Platform.CAIP
+    )
+    details = {"project_id": "project", "jobId": job_id}
+    return Job(
+      spec=spec, container="container", details=details, status=JobStatus.SUBMITTED
+    )
+
+  states = {
+    "projects/project/jobs/a": "RUNNING",
+    "projects/project/jobs/b": "SUCCEEDED",
+    "projects/project/jobs/c": "QUEUED",
+    "projects/project/jobs/e": "FAILED",
+  }
+  batches = []
+
+  class FakeBatch:
+    def __init__(self, callback):
+      self.callback = callback
+      self.requests = []
+      batches.append(self)
+
+    def add(self, name, request_id):
+      self.requests.append((request_id, name))
+
+    def execute(self):
+      for request_id, name in self.requests:
+        if name in states:
+          self.callback(request_id, {"state": states[name]}, None)
+        else:
+          self.callback(request_id, None, Exception("not found"))
+
+  class FakeJobs:
+    def get(self, name):
+      return name
+
+  class FakeService:
+    def projects(self):
+      return self
+
+    def jobs(self):
+      return FakeJobs()
+
+    def new_batch_http_request(self, callback):
+      return FakeBatch(callback)
+
+  monkeypatch.setattr(hu, "_get_caip_service", lambda: FakeService())
+  monkeypatch.setattr(hu, "_CAIP_MAX_BATCH_SIZE", 2)
+
+  jobs = [caip_job(x) for x in "abcde"]
+  update_job_statuses(jobs)
+
+  assert [len(b.requests) for b in batches] == [2, 2, 1]
+  assert [j.status for j in jobs] == [
+    JobStatus.RUNNING,
+    JobStatus.SUCCEEDED,
+    JobStatus.SUBMITTED,
+    JobStatus.UNKNOWN,
+    JobStatus.FAILED,
+  ]
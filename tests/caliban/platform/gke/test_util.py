@@ -886,9 +886,13 @@ def test_credentials_from_file(monkeypatch):
 # ----------------------------------------------------------------------------
 def test_credentials(monkeypatch):
   class MockCreds:
+    expired = False
+
     def refresh(self, req):
       pass
 
+  monkeypatch.setattr(util, "_CREDENTIALS", {})
+
   creds = MockCreds()
   project_id = "project-foo"
 
@@ -925,6 +929,41 @@ def test_credentials(monkeypatch):
     assert cd.project_id == project_id
 
 
+# ----------------------------------------------------------------------------
+def test_credentials_cached(monkeypatch):
+  """credentials are loaded once, and again only once they've expired"""
+
+  class MockCreds:
+    expired = False
+
+    def refresh(self, req):
+      pass
+
+  loads = []
+
+  def mock_default(scopes):
+    loads.append(scopes)
+    return (MockCreds(), "project-foo")
+
+  monkeypatch.setattr(util, "_CREDENTIALS", {})
+  monkeypatch.setattr(google.auth, "default", mock_default)
+  monkeypatch.setattr(google.auth.transport.requests, "Request", lambda: None)
+
+  cd = util.credentials()
+  assert util.credentials() is cd
+  assert len(loads) == 1
+
+  cd.credentials.expired = True
+  assert util.credentials() is not cd
+  assert len(loads) == 2
+
+  # failed loads aren't cached
+  monkeypatch.setattr(util, "_CREDENTIALS", {})
+  monkeypatch.setattr(google.auth, "default", lambda scopes: 1 / 0)
+  assert util.credentials().credentials is None
+  assert util._CREDENTIALS == {}
+
+
 # ----------------------------------------------------------------------------
 def test_parse_job_file():
   # test invalid file extension
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""unit tests for local job execution"""
+
+import threading
+
+import caliban.platform.run as r
+from caliban.history.types import (
+  ContainerSpec,
+  Experiment,
+  ExperimentGroup,
+  JobSpec,
+  JobStatus,
+  Platform,
+)
+from caliban.history.util import get_mem_engine, session_scope
+
+import pytest
+
+
+@pytest.fixture()
+def session():
+  with session_scope(get_mem_engine()) as session:
+    yield session
+
+
+def job_specs(n):
+  """n local job specs. Each job's command is its 1-based index."""
+  e = Experiment.get_or_create(
+    xgroup=ExperimentGroup(), container_spec=ContainerSpec(spec={})
+  )
+  return [
+    JobSpec.get_or_create(
+      experiment=e,
+      spec={"command": [str(i)], "container": "container"},
+      platform=Platform.LOCAL,
+    )
+    for i in range(1, n + 1)
+  ]
+
+
+@pytest.fixture()
+def recorded(monkeypatch):
+  """(index, status) of each job, in the order the jobs are recorded."""
+  recorded = []
+  monkeypatch.setattr(
+    r, "local_callback", lambda idx, job: recorded.append((idx, job.status))
+  )
+  return recorded
+
+
+def test_jobs_recorded_in_submission_order(session, monkeypatch, recorded):
+  """jobs that finish out of order are still recorded in the order they were
+  supplied."""
+  first_done = threading.Event()
+  last_done = threading.Event()
+
+  def execute(command, dry_run, line_prefix):
+    idx = int(command[0])
+    # the jobs finish in reverse order.
+    if idx == 1:
+      assert last_done.wait(timeout=5)
+      first_done.set()
+    elif idx == 2:
+      assert first_done.wait(timeout=5)
+    else:
+      last_done.set()
+    return idx % 2
+
+  monkeypatch.setattr(r, "_execute_command", execute)
+  r.execute_jobs(job_specs(3), parallelism=3)
+
+  assert recorded == [
+    (1, JobStatus.FAILED),
+    (2, JobStatus.SUCCEEDED),
+    (3, JobStatus.FAILED),
+  ]
+
+
+def test_free_slot_refilled_when_any_job_finishes(session, monkeypatch, recorded):
+  """a job starts as soon as any running job finishes, rather than once every
+  running job has finished."""
+  third_started = threading.Event()
+
+  def execute(command, dry_run, line_prefix):
+    idx = int(command[0])
+    if idx == 1:
+      # only finishes once job 3 has taken the slot job 2 freed up.
+      assert third_started.wait(timeout=5)
+    elif idx == 3:
+      third_started.set()
+    return 0
+
+  monkeypatch.setattr(r, "_execute_command", execute)
+  r.execute_jobs(job_specs(3), parallelism=2)
+
+  assert third_started.is_set()
+  assert [idx for idx, _ in recorded] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("parallelism,max_running", [(1, 1), (2, 2)])
+def test_parallelism(session, monkeypatch, recorded, parallelism, max_running):
+  """no more than parallelism jobs run at once; a parallelism of 1 runs each job
+  to completion, in order, before starting the next. Output is only tagged with
+  the job index when jobs run side by side."""
+  lock = threading.Lock()
+  running = []
+  seen = []
+
+  def execute(command, dry_run, line_prefix):
+    with lock:
+      running.append(command[0])
+      seen.append((command[0], len(running), line_prefix))
+
+    threading.Event().wait(0.01)
+
+    with lock:
+      running.remove(command[0])
+    return 0
+
+  monkeypatch.setattr(r, "_execute_command", execute)
+  r.execute_jobs(job_specs(4), parallelism=parallelism)
+
+  assert max(n for _, n, _ in seen) <= max_running
+  assert [idx for idx, _ in recorded] == [1, 2, 3, 4]
+
+  if parallelism == 1:
+    assert seen == [(str(i), 1, "") for i in range(1, 5)]
+  else:
+    assert sorted(p for _, _, p in seen) == [f"[{i}] " for i in range(1, 5)]
@@ -144,6 +144,24 @@ def test_tmp_copy(tmpdir):
   assert not os.path.exists(m[from_b_path])
 
 
+def test_link_or_copy(tmpdir):
+  src = tmpdir.join("src.json")
+  src.write("face")
+
+  # Links share data with the source.
+  dst = tmpdir.join("dst.json")
+  ufs._link_or_copy(str(src), str(dst))
+  assert dst.read() == "face"
+  assert os.path.samefile(src, dst)
+
+  # If a link can't be made, the source is copied over the destination.
+  dst.remove()
+  dst.write("cake")
+  ufs._link_or_copy(str(src), str(dst))
+  assert dst.read() == "face"
+  assert not os.path.samefile(src, dst)
+
+
 def test_capture_stdout():
   buf = io.StringIO()
   ret_string, code = ufs.capture_stdout(["echo", "hello!"], file=buf)
@@ -159,3 +177,20 @@ def test_capture_stdout_input():
   ret_string, code = ufs.capture_stdout(["cat"], input_str="hello!")
   assert code == 0
   assert ret_string.rstrip() == "hello!"
+
+
+def test_capture_stdout_env():
+  ret_string, code = ufs.capture_stdout(
+    ["sh", "-c", "echo $CALIBAN_TEST"], env={"CALIBAN_TEST": "cake"}
+  )
+  assert code == 0
+  assert ret_string.rstrip() == "cake"
+
+
+def test_stream_stdout():
+  buf = io.StringIO()
+  code = ufs.stream_stdout(["cat"], input_str="hello!", file=buf)
+  assert code == 0
+  assert buf.getvalue().rstrip() == "hello!"
+
+  assert ufs.stream_stdout(["false"], file=buf) == 1
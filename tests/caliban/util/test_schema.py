@@ -45,3 +45,13 @@ def test_file():
 
   # Check that the formatting string works.
   assert e.match("File 'random' isn't")
+
+
+def test_positive_int():
+  assert us.PositiveInt.validate("3") == 3
+
+  for bad in ["0", "-1", "face"]:
+    with pytest.raises(s.SchemaError) as e:
+      us.PositiveInt.validate(bad)
+
+    assert e.match(f"'{bad}' isn't a positive integer")
@@ -22,9 +22,9 @@ import caliban.util.tqdm as ut
 
 
 def test_carriage_return():
-  def through(xs):
+  def through(xs, line_prefix=""):
     buf = io.StringIO()
-    f = ut.TqdmFile(file=buf)
+    f = ut.TqdmFile(file=buf, line_prefix=line_prefix)
 
     for x in xs:
       f.write(x)
@@ -44,3 +44,9 @@ def test_carriage_return():
 
   # Boom, triggered.
   assert through(["Yo!\r", "continue"]) == f"Yo!\n{_term_move_up()}\rcontinue"
+
+  # A line prefix goes before every non-empty line, after the carriage return
+  # prefix.
+  assert through(["a\n", "", "b\r", "c\n"], line_prefix="[1] ") == (
+    f"[1] a\n[1] b\n{_term_move_up()}\r[1] c\n"
+  )